@@ -31,7 +31,6 @@ class Utility:
         self.api = tweepy.API(auth)
         self.loop_count = 0
         self.recursion_limit = 10000
-        self.api_issues = 0
         self.weverse_client = WeverseAsync(authorization=keys.weverse_auth_token, web_session=self.session,
                                            verbose=True, loop=asyncio.get_event_loop())
         self.exceptions = exceptions
@@ -56,6 +55,14 @@ class Utility:
         self.u_self_assign_roles = None
         self.u_reminder = None
         self.u_guessinggame = None
+        self.u_change_feed = None
+        self.u_snapshot = None
+        self.u_photo_pool = None
+        self.u_api = None
+        self.u_write_behind = None
+        self.u_reactions = None
+        self.u_message_router = None
+        self.u_archive = None
 
     @staticmethod
     def first_result(record):
@@ -147,56 +154,54 @@ class Utility:
 
     async def wait_for_reaction(self, msg, user_id, reaction_needed):
         """Wait for a user's reaction on a message."""
-        def react_check(reaction_used, user_reacted):
-            return (user_reacted.id == user_id) and (reaction_used.emoji == reaction_needed)
+        def react_check(payload):
+            return payload.user_id == user_id and str(payload.emoji) == reaction_needed
 
         try:
-            # noinspection PyUnusedLocal
-            reaction, user = await self.client.wait_for('reaction_add', timeout=60, check=react_check)
+            await self.u_reactions.wait_for_reaction(msg.id, react_check, timeout=60)
             return True
         except asyncio.TimeoutError:
             await msg.delete()
             return False
 
     async def check_left_or_right_reaction_embed(self, msg, embed_lists, original_page_number=0, reaction1=keys.previous_emoji, reaction2=keys.next_emoji):
-        """This method is used for going between pages of embeds."""
+        """This method is used for going between pages of embeds.
+
+        Pages stop changing once nobody has reacted for 5 minutes.
+        """
         await msg.add_reaction(reaction1)  # left arrow by default
         await msg.add_reaction(reaction2)  # right arrow by default
 
-        def reaction_check(user_reaction, reaction_user):
-            """Check if the reaction is the right emoji and right user."""
-            return ((user_reaction.emoji == '➡') or (
-                        user_reaction.emoji == '⬅')) and reaction_user != msg.author and user_reaction.message.id == msg.id
+        def reaction_check(payload):
+            """Check if the reaction is the right emoji."""
+            return str(payload.emoji) in (reaction1, reaction2)
 
-        async def change_page(c_page):
-            """Waits for the user's reaction and then changes the page based on their reaction."""
+        c_page = original_page_number
+        while True:
+            try:
+                payload = await self.u_reactions.wait_for_reaction(msg.id, reaction_check, timeout=300)
+            except asyncio.TimeoutError:
+                return
             try:
-                reaction, user = await self.client.wait_for('reaction_add', check=reaction_check)
-                if reaction.emoji == '➡':
+                if str(payload.emoji) == reaction2:
                     c_page += 1
                     if c_page >= len(embed_lists):
                         c_page = 0  # start from the beginning of the list
                     await msg.edit(embed=embed_lists[c_page])
 
-                elif reaction.emoji == '⬅':
+                elif str(payload.emoji) == reaction1:
                     c_page -= 1
                     if c_page < 0:
                         c_page = len(embed_lists) - 1  # going to the end of the list
                     await msg.edit(embed=embed_lists[c_page])
 
-                # await msg.clear_reactions()
-                # await msg.add_reaction(reaction1)
-                # await msg.add_reaction(reaction2)
                 # only remove user's reaction instead of all reactions
                 try:
-                    await reaction.remove(user)
+                    await msg.remove_reaction(payload.emoji, discord.Object(id=payload.user_id))
                 except:
                     pass
-                await change_page(c_page)
             except Exception as e:
                 log.console(f"check_left_or_right_reaction_embed - {e}")
-                await change_page(c_page)
-        await change_page(original_page_number)
 
     @staticmethod
     async def set_embed_author_and_footer(embed, footer_message):
@@ -0,0 +1,6 @@
+-- progress of channel backfills started with %addhistory, so an interrupted backfill continues where it stopped.
+CREATE TABLE IF NOT EXISTS archive.historycheckpoints
+(
+    channelid bigint PRIMARY KEY,
+    messageid bigint NOT NULL
+);
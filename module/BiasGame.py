@@ -91,9 +91,8 @@ class Game:
 
     async def check_message(self, message, first_idol, second_idol):
         """Check the reactions of the message and process results"""
-        def check_response(user_reaction, reaction_user):
-            return ((user_reaction.emoji == '➡') or (user_reaction.emoji == '⬅')) and reaction_user != message.author\
-                   and user_reaction.message.id == message.id and reaction_user.id == self.host
+        def check_response(payload):
+            return str(payload.emoji) in (keys.previous_emoji, keys.next_emoji) and payload.user_id == self.host
 
         def add_winner(idol):
             """Add the winner to the next bracket and have them face the previous idol that won."""
@@ -105,10 +104,10 @@ class Game:
             self.secondary_bracket_teams.append([idol])
 
         try:
-            reaction, user = await ex.client.wait_for('reaction_add', check=check_response, timeout=60)
-            if reaction.emoji == '⬅':
+            payload = await ex.u_reactions.wait_for_reaction(message.id, check_response, timeout=60)
+            if str(payload.emoji) == keys.previous_emoji:
                 add_winner(first_idol)
-            elif reaction.emoji == '➡':
+            elif str(payload.emoji) == keys.next_emoji:
                 add_winner(second_idol)
             await message.delete()
         except asyncio.TimeoutError:
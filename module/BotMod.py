@@ -3,37 +3,30 @@ from discord.ext import commands
 from module import logger as log, keys
 from Utility import resources as ex
 import aiofiles
+import time
 
 
 # noinspection PyBroadException,PyPep8
 class BotMod(commands.Cog):
     @staticmethod
-    async def mod_on_message(message):
+    async def mod_on_message(message_context):
         # mod mail
         try:
+            message = message_context.message
             message_sender = message.author
-            message_channel = message.channel
-            message_content = message.content
-            if message_sender.id == keys.bot_id:
-                return
-            if 'closedm' in message_content or 'createdm' in message_content:
-                return
-            for user_id in ex.cache.mod_mail:
-                try:
-                    channel_id = ex.cache.mod_mail.get(user_id)
-                    mod_channel = await ex.client.fetch_channel(channel_id)
-                    if user_id == message_sender.id:
-                        dm_channel = await ex.get_dm_channel(message_sender.id)
-                        if message_channel.id == dm_channel:
-                            await mod_channel.send(
-                                f">>> FROM: {message_sender.display_name} ({message_sender.id}) - {message_content}")
-                    if mod_channel == message_channel:
-                        dm_channel = await ex.get_dm_channel(user_id)
-                        await dm_channel.send(
-                            f">>> FROM: {message_sender.display_name} ({message_sender.id}) - {message_content}")
-                except:
-                    # change in dictionary size should break the loop.
-                    break
+            forward = f">>> FROM: {message_sender.display_name} ({message_sender.id}) - {message.content}"
+            if message_context.guild_id is None:
+                # a user sending a DM to their mod channel.
+                channel_id = ex.cache.mod_mail.get(message_sender.id)
+                if channel_id:
+                    mod_channel = ex.client.get_channel(channel_id) or await ex.client.fetch_channel(channel_id)
+                    await mod_channel.send(forward)
+            else:
+                # a mod replying to the user of the channel.
+                user_id = ex.cache.mod_mail_channels.get(message_context.channel_id)
+                if user_id:
+                    dm_channel = await ex.get_dm_channel(user_id)
+                    await dm_channel.send(forward)
         except Exception as e:
             log.console(f"{e} - BotMod.mod_on_message")
 
@@ -246,6 +239,48 @@ class BotMod(commands.Cog):
         await ex.u_cache.create_group_cache()
         await ctx.send(f"> Merged {duplicate_group_id} to {original_group_id}.")
 
+    @commands.command()
+    @commands.check(ex.check_if_mod)
+    async def cachememory(self, ctx):
+        """Shows the memory used by idol and group objects and the bytes saved by their compact representation.
+        [Format: %cachememory]"""
+        idol_size = ex.u_cache.get_object_size(ex.cache.idols)
+        group_size = ex.u_cache.get_object_size(ex.cache.groups)
+        slot_savings, intern_savings, tuple_savings = ex.u_group_members.get_compact_savings(
+            ex.cache.idols + ex.cache.groups)
+        total_savings = slot_savings + intern_savings + tuple_savings
+        await ctx.send(f">>> **Idols ({len(ex.cache.idols)}):** {idol_size:,} bytes\n"
+                       f"**Groups ({len(ex.cache.groups)}):** {group_size:,} bytes\n"
+                       f"**Saved by slots:** {slot_savings:,} bytes\n"
+                       f"**Saved by interned strings:** {intern_savings:,} bytes\n"
+                       f"**Saved by tag tuples:** {tuple_savings:,} bytes\n"
+                       f"**Total saved:** {total_savings:,} bytes")
+
+    @commands.command()
+    @commands.check(ex.check_if_mod)
+    async def cachestats(self, ctx):
+        """Shows the load time, rows fetched, entries, memory, and last refresh of every cache.
+        [Format: %cachestats]"""
+        embed_list = []
+        embed = None
+        for count, (loader_name, stats) in enumerate(sorted(ex.u_cache.loader_stats.items(),
+                                                            key=lambda loader: loader[1].get("duration"),
+                                                            reverse=True)):
+            if count % 10 == 0:
+                embed = await ex.create_embed(title=f"Cache Statistics Page {len(embed_list) + 1}")
+                embed_list.append(embed)
+            last_refresh = await ex.u_miscellaneous.get_cooldown_time(time.time() - stats.get("last_refresh"))
+            embed.add_field(name=loader_name, value=f"Load Time: {round(stats.get('duration'), 3)}s\n"
+                                                    f"Rows Fetched: {stats.get('rows'):,}\n"
+                                                    f"Entries: {stats.get('entries'):,}\n"
+                                                    f"Memory: {stats.get('memory'):,} bytes\n"
+                                                    f"Last Refresh: {last_refresh} ago", inline=True)
+        if not embed_list:
+            return await ctx.send("> **The cache has not been created yet.**")
+        msg = await ctx.send(embed=embed_list[0])
+        if len(embed_list) > 1:
+            await ex.check_left_or_right_reaction_embed(msg, embed_list)
+
     @commands.command()
     @commands.check(ex.check_if_mod)
     async def killapi(self, ctx):
@@ -301,6 +336,8 @@ Have questions? Join the support server at {keys.bot_support_server_link}."""
                 await game.channel.send(message)
             except:
                 pass
+        # write the counts of the last few seconds before the connection closes.
+        await ex.u_write_behind.stop()
         await ex.client.logout()
 
     @commands.command()
@@ -456,7 +493,7 @@ Have questions? Join the support server at {keys.bot_support_server_link}."""
         try:
             dm_channel = await ex.get_dm_channel(user=user)
             if dm_channel is not None:
-                ex.cache.mod_mail[user.id] = ctx.channel.id
+                await ex.u_miscellaneous.add_mod_mail_to_cache(user.id, ctx.channel.id)
                 await ex.conn.execute("INSERT INTO general.modmail(userid, channelid) VALUES ($1, $2)", user.id, ctx.channel.id)
                 await dm_channel.send(f"> {ctx.author.display_name} ({ctx.author.id}) has created a DM with you. All messages sent here will be sent to them.")
                 await ctx.send(f"> A DM has been created with {user.id}. All messages you type in this channel will be sent to the user.")
@@ -475,11 +512,11 @@ Have questions? Join the support server at {keys.bot_support_server_link}."""
             if user is not None:
                 user_id = user.id
             else:
-                user_id = ex.first_result(await ex.conn.fetchrow("SELECT userid FROM general.modmail WHERE channelid = $1", ctx.channel.id))
-            dm_channel = await ex.get_dm_channel(user_id)
+                user_id = ex.cache.mod_mail_channels.get(ctx.channel.id)
+            dm_channel = await ex.get_dm_channel(user_id) if user_id else None
             if dm_channel is None:
                 return await ctx.send("> **There are no DMs set up in this channel.**")
-            ex.cache.mod_mail.pop(user_id, None)
+            await ex.u_miscellaneous.remove_mod_mail_from_cache(user_id)
             await ex.conn.execute("DELETE FROM general.modmail WHERE userid = $1 and channelid = $2", user_id, ctx.channel.id)
             await ctx.send(f"> The DM has been deleted successfully.")
             await dm_channel.send(f"> {ctx.author.display_name} ({ctx.author.id}) has closed the DM with you. Your messages will no longer be sent to them.")
@@ -1,25 +1,18 @@
+import discord
 from discord.ext import commands
-from module import logger as log, keys
+from module import logger as log
 from Utility import resources as ex
+from util.pagination import LazyEmbedList
+import copy
 
 
 # noinspection PyPep8
 class CustomCommands(commands.Cog):
     @staticmethod
-    async def process_custom_commands(message):
+    async def process_custom_commands(message_context):
         # custom server commands
-        if not message.content or message.author.bot:
-            return
-
-        if await ex.u_miscellaneous.check_if_bot_banned(message.author.id):
-            return
-
-        guild_id = await ex.get_server_id(message)
-        current_message_prefix = message.content[0:len(keys.bot_prefix)]
-        if current_message_prefix == keys.bot_prefix:
-            message_without_prefix = message.content[len(keys.bot_prefix):len(message.content)].lower()
-            if await ex.u_custom_commands.check_custom_command_name_exists(guild_id, message_without_prefix):
-                await message.channel.send(await ex.u_custom_commands.get_custom_command(guild_id, message_without_prefix))
+        await message_context.message.channel.send(
+            await ex.u_custom_commands.get_custom_command(message_context.guild_id, message_context.lower_without_prefix))
 
     @commands.command(aliases=['addcommand'])
     @commands.has_guild_permissions(manage_messages=True)
@@ -54,34 +47,21 @@ class CustomCommands(commands.Cog):
     async def listcommands(self, ctx):
         """List all the custom commands for this server. [Format: %listcommands]"""
         try:
-            async def get_new_embed(desc):
-                return await ex.create_embed(f"Custom Commands for {ctx.guild.name} ({ctx.guild.id})", color=ex.get_random_color(),
-                                             title_desc=desc)
-            custom_commands = ex.cache.custom_commands.get(ctx.guild.id)
-            embed_list = []
-            embed_message = ""
-
-            if not custom_commands:
+            pages = ex.u_custom_commands.get_command_pages(ctx.guild.id)
+            if not pages:
                 return await ctx.send("> There are no custom commands for your server.")
+            template = (await ex.create_embed(f"Custom Commands for {ctx.guild.name} ({ctx.guild.id})")).to_dict()
 
-            for command in custom_commands:
-                added_to_list = False
-                message = f"**{command}** -> {custom_commands.get(command)}\n"
-                if len(message) > 1000:
-                    embed_list.append(await get_new_embed(message))
-                    added_to_list = True
+            def render_page(page_index, page):
+                embed = discord.Embed.from_dict(copy.deepcopy(template))
+                embed.description = page
+                embed.colour = ex.get_random_color()
+                return embed
 
-                if not added_to_list:
-                    embed_message += message
-                    if len(embed_message) >= 950:
-                        embed_list.append(await get_new_embed(embed_message))
-                        embed_message = ""
-            if embed_message:
-                embed_list.append(await get_new_embed(embed_message))
-            if embed_list:
-                msg = await ctx.send(embed=embed_list[0])
-                if len(embed_list) > 1:
-                    await ex.check_left_or_right_reaction_embed(msg, embed_list)
+            embed_list = LazyEmbedList(pages, render_page)
+            msg = await ctx.send(embed=embed_list[0])
+            if len(embed_list) > 1:
+                await ex.check_left_or_right_reaction_embed(msg, embed_list)
 
         except Exception as e:
             await ctx.send(f"> An unexpected error occurred -> {e}. Please {await ex.get_server_prefix_by_context(ctx)}report it.")
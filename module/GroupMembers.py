@@ -73,22 +73,14 @@ async def request_image_post(message, idol, channel):
 
 async def choose_random_member(members=None, groups=None):
     """Choose a random member object from a member or group list given."""
-    async def check_photo_count(t_member_ids):
-        t_member_id = random.choice(t_member_ids)
-        t_member = await ex.u_group_members.get_member(t_member_id)
-        if not t_member.photo_count:
-            t_member = await check_photo_count(t_member_ids)
-        return t_member
-
     idol = None
     new_groups = []
     if groups:
         for group in groups:
-            if group.photo_count:
+            if ex.cache.group_photo_members.get(group.id):
                 new_groups.append(group)
     if new_groups:
-        member_ids = (random.choice(new_groups)).members
-        idol = await check_photo_count(member_ids)
+        idol = await ex.u_group_members.get_random_group_member(random.choice(new_groups))
 
     new_members = []
     if members:
@@ -103,16 +95,14 @@ async def choose_random_member(members=None, groups=None):
 # noinspection PyBroadException,PyPep8
 class GroupMembers(commands.Cog):
     @staticmethod
-    async def on_message2(message):
+    async def on_message2(message_context):
+        message = message_context.message
         # create modifiable var without altering original
         channel = message.channel
-        if message.author.bot or not await ex.u_group_members.check_channel_sending_photos(channel.id) or await ex.u_miscellaneous.check_if_temp_channel(channel.id):
+        if not await ex.u_group_members.check_channel_sending_photos(channel.id):
             return
-        try:
-            if await ex.u_group_members.check_server_sending_photos(message.guild.id):
-                channel = await ex.u_group_members.get_channel_sending_photos(message.guild.id)
-        except:
-            pass  # error is guild not found, likely being accessed from DMs
+        if message_context.guild_id and await ex.u_group_members.check_server_sending_photos(message_context.guild_id):
+            channel = await ex.u_group_members.get_channel_sending_photos(message_context.guild_id)
         posted = False
         api_url = None
         try:
@@ -124,16 +114,11 @@ class GroupMembers(commands.Cog):
                     pass
             if ex.u_miscellaneous.check_message_not_empty(message):
                 random_member = False
-                # since this is a listener, the prefix is put back to the default
-                # (from the original on_message)
-                # and we do not need to worry about the user's server prefix for idol photos
-                # we just need to make sure it has the bot's default prefix
-                # however this means if a user changes the prefix and uses the bot's default prefix
+                # idol photos are sent with the server prefix or the bot's default prefix.
+                # this means if a user changes the prefix and uses the bot's default prefix
                 # it will still process idol photos, but not regular commands.
-                if message.content[0:len(keys.bot_prefix)] != keys.bot_prefix or message.content.lower() == f"{keys.bot_prefix}null":
-                    return
-                message_content = message.content[len(keys.bot_prefix):len(message.content)]
-                server_id = await ex.get_server_id(message)
+                message_content = message_context.without_prefix
+                server_id = message_context.guild_id
                 members = await ex.u_group_members.get_idol_where_member_matches_name(message_content, server_id=server_id)
                 groups = await ex.u_group_members.get_group_where_group_matches_name(message_content, server_id=server_id)
                 photo_msg = None
@@ -341,7 +326,7 @@ Requester: {ctx.author.display_name} ({ctx.author.id})
         if await ex.u_group_members.check_channel_sending_photos(text_channel.id):
             try:
                 await ex.conn.execute("INSERT INTO groupmembers.restricted(channelid, serverid, sendhere) VALUES($1, $2, $3)", text_channel.id, ctx.guild.id, 0)
-                ex.cache.restricted_channels[text_channel.id] = [ctx.guild.id, 0]
+                await ex.u_group_members.add_restricted_channel_to_cache(text_channel.id, ctx.guild.id, 0)
                 await ctx.send(f"> **{text_channel.name} can no longer send idol photos.**")
             except:
                 await ctx.send(f"> **{text_channel.name} is currently being used with {await ex.get_server_prefix_by_context(ctx)}sendimages and can not be restricted.**")
@@ -358,27 +343,19 @@ Requester: {ctx.author.display_name} ({ctx.author.id})
         if not text_channel:
             text_channel = ctx.channel
         if await ex.u_group_members.check_channel_sending_photos(text_channel.id):
-            if await ex.u_group_members.check_server_sending_photos(server_id=ctx.guild.id):
-                old_channel = await ex.u_group_members.get_channel_sending_photos(ctx.guild.id)
-                if old_channel:
-                    if old_channel.id == text_channel.id:
-                        await ex.conn.execute("DELETE FROM groupmembers.restricted WHERE channelid = $1 AND serverid = $2 AND sendhere = $3", text_channel.id, ctx.guild.id, 1)
-                        await ex.u_group_members.delete_restricted_channel_from_cache(text_channel.id, 1)
-                        return await ctx.send(f"> **{text_channel.name} will no longer send all idol photo commands.**")
-                else:
-                    delete_channel_id = None
-                    await ex.conn.execute("UPDATE groupmembers.restricted SET channelid = $1 WHERE serverid = $2 AND sendhere = $3", text_channel.id, ctx.guild.id, 1)
-                    for channel_id in ex.cache.restricted_channels:
-                        channel_info = ex.cache.restricted_channels.get(channel_id)
-                        if channel_info[0] == ctx.guild.id and channel_info[1] == 1:
-                            delete_channel_id = channel_id
-                    if delete_channel_id:
-                        # this seemingly useless snippet of code is to avoid runtime errors during iteration.
-                        ex.cache.restricted_channels.pop(delete_channel_id)
-                        ex.cache.restricted_channels[text_channel.id] = [ctx.guild.id, 1]
+            old_channel_id = ex.cache.send_here_channels.get(ctx.guild.id)
+            if old_channel_id == text_channel.id:
+                await ex.conn.execute("DELETE FROM groupmembers.restricted WHERE channelid = $1 AND serverid = $2 AND sendhere = $3", text_channel.id, ctx.guild.id, 1)
+                await ex.u_group_members.delete_restricted_channel_from_cache(text_channel.id, 1)
+                return await ctx.send(f"> **{text_channel.name} will no longer send all idol photo commands.**")
+            elif old_channel_id:
+                # move the server's photo channel to the new text channel.
+                await ex.conn.execute("UPDATE groupmembers.restricted SET channelid = $1 WHERE serverid = $2 AND sendhere = $3", text_channel.id, ctx.guild.id, 1)
+                await ex.u_group_members.delete_restricted_channel_from_cache(old_channel_id, 1)
+                await ex.u_group_members.add_restricted_channel_to_cache(text_channel.id, ctx.guild.id, 1)
             else:
                 await ex.conn.execute("INSERT INTO groupmembers.restricted(channelid, serverid, sendhere) VALUES ($1, $2, $3)", text_channel.id, ctx.guild.id, 1)
-                ex.cache.restricted_channels[text_channel.id] = [ctx.guild.id, 1]
+                await ex.u_group_members.add_restricted_channel_to_cache(text_channel.id, ctx.guild.id, 1)
             await ctx.send(f"> **{text_channel.name} will now receive and send all idol photo commands coming from this server.**")
         else:
             await ctx.send(f"> **{text_channel.name} is currently restricted from idol photos with {await ex.get_server_prefix_by_context(ctx)}stopimages.**")
@@ -393,7 +370,10 @@ Requester: {ctx.author.display_name} ({ctx.author.id})
                     channel = await ex.u_group_members.get_channel_sending_photos(ctx.guild.id)
             except:
                 pass  # error is guild not found, likely being accessed from DMs
-            idol = await ex.u_group_members.get_random_idol()
+            try:
+                idol = await ex.u_group_members.get_random_idol()
+            except ex.exceptions.NoIdolFound:
+                return await ctx.send("> **There are no idol photos available right now.**")
             photo_msg, api_url, posted = await request_image_post(ctx.message, idol, channel)
             if posted:
                 add_user_limit(ctx.author)
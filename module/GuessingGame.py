@@ -95,6 +95,8 @@ class Game:
         self.gender_forced = False
         # difficulty must be in this list in order for it to
         self.difficulty = None
+        # idol of the next round
+        self.next_idol = None
 
     async def start_game(self, ctx, max_rounds=20, timeout=20, gender="all", difficulty="medium"):
         """Start a guessing game."""
@@ -146,6 +148,12 @@ class Game:
             if not self.force_ended:
                 await self.print_answer()
 
+    async def choose_idol(self):
+        """Choose a random idol for a round."""
+        if not self.gender_forced:
+            self.gender = random.choice(['m', 'f'])
+        return await ex.u_group_members.get_random_idol(gender=self.gender, difficulty=self.difficulty)
+
     async def create_new_question(self):
         """Create a new question and send it to the channel."""
         # noinspection PyBroadException
@@ -160,13 +168,15 @@ class Game:
                 if not self.force_ended:
                     await self.end_game()
                 return True  # will properly end the game.
-            self.idol = await ex.u_group_members.get_random_idol()
-            if not self.gender_forced:
-                self.gender = random.choice(['m', 'f'])
-
-            while self.idol.gender != self.gender or ex.cache.difficulty_aliases[self.idol.difficulty] > self.difficulty:
-                # will result in an infinite loop if there are no idols on easy mode and difficulty is easy mode.
-                self.idol = await ex.u_group_members.get_random_idol()
+            try:
+                self.idol = self.next_idol or await self.choose_idol()
+                # the photo of the next round is fetched while the current round is played.
+                self.next_idol = await self.choose_idol()
+                ex.u_photo_pool.prefetch(self.next_idol.id, guessing_game=True)
+            except ex.exceptions.NoIdolFound:
+                await self.channel.send("> **There are no idols available for this gender and difficulty.**")
+                await self.end_game()
+                return True
 
             self.group_names = [(await ex.u_group_members.get_group(group_id)).name for group_id in self.idol.groups]
             self.correct_answers = []
@@ -7,7 +7,8 @@ from Utility import resources as ex
 # noinspection PyPep8
 class Logging(commands.Cog):
     @staticmethod
-    async def on_message_log(message):
+    async def on_message_log(message_context):
+        message = message_context.message
         if await ex.u_logging.check_logging_requirements(message):
             try:
                 if await ex.u_logging.get_send_all(message.guild.id):
@@ -47,7 +48,8 @@ class Logging(commands.Cog):
             return await ctx.send(f"> **{text_channel.name} can not be logged since log messages are sent here.**")
         logging_id = await ex.u_logging.get_logging_id(ctx.guild.id)
         await ex.conn.execute("INSERT INTO logging.channels (channelid, server) VALUES($1, $2)", text_channel.id, logging_id)
-        ex.cache.list_of_logged_channels.append(text_channel.id)
+        ex.cache.logged_channel_ids.add(text_channel.id)
+        ex.cache.logged_channels[ctx.guild.id]['channels'].append(text_channel.id)
         await ctx.send(f"> **{text_channel.name} is now being logged.**")
 
     @commands.has_guild_permissions(manage_messages=True)
@@ -58,7 +60,10 @@ class Logging(commands.Cog):
             text_channel = ctx.channel
         if await ex.u_logging.check_if_logged(channel_id=text_channel.id):
             await ex.conn.execute("DELETE FROM logging.channels WHERE channelid = $1", text_channel.id)
-            ex.cache.list_of_logged_channels.remove(text_channel.id)
+            ex.cache.logged_channel_ids.discard(text_channel.id)
+            server = ex.cache.logged_channels.get(ctx.guild.id)
+            if server and text_channel.id in server['channels']:
+                server['channels'].remove(text_channel.id)
             await ctx.send(f"> **{text_channel.name} is no longer being logged.**")
         else:
             await ctx.send(f"> **{text_channel.name} is not being logged.**")
@@ -10,32 +10,37 @@ import datetime
 # noinspection PyBroadException,PyPep8
 class Miscellaneous(commands.Cog):
     @staticmethod
-    async def on_message_notifications(message):
+    async def on_message_notifications(message_context):
         # user phrase notifications
+        message = message_context.message
         try:
-            if message.author.bot:
+            phrases = ex.cache.user_notifications.get(message_context.guild_id)
+            if not phrases:
                 return
-            for guild_id, user_id, phrase in ex.cache.user_notifications:
-                message_split = message.content.lower().split(" ")
-                if phrase not in message_split or guild_id != message.guild.id:
-                    continue
-                if message.author.id == user_id or user_id not in [member.id for member in message.channel.members]:
-                    continue
-                log.console(f"message_notifications 1 - {phrase} to {user_id}")
-                dm_channel = await ex.get_dm_channel(user_id)
-                log.console(f"message_notifications 2 - {phrase} to {user_id}")
-                start_loc = (message.content.lower()).find(phrase)
-                end_loc = start_loc + len(phrase)
-                new_message_content = f"{message.content[0:start_loc]}`{message.content[start_loc:end_loc]}`{message.content[end_loc:len(message.content)]}"
-                title_desc = f"""
+            # only the phrases that are words of the message are checked.
+            message_words = set(message_context.lower_content.split(" "))
+            for phrase in message_words & phrases.keys():
+                for user_id in list(phrases.get(phrase) or []):
+                    if message_context.author_id == user_id:
+                        continue
+                    member = message.guild.get_member(user_id)
+                    if not member or not message.channel.permissions_for(member).read_messages:
+                        continue
+                    log.console(f"message_notifications 1 - {phrase} to {user_id}")
+                    dm_channel = await ex.get_dm_channel(user_id)
+                    log.console(f"message_notifications 2 - {phrase} to {user_id}")
+                    start_loc = message_context.lower_content.find(phrase)
+                    end_loc = start_loc + len(phrase)
+                    new_message_content = f"{message.content[0:start_loc]}`{message.content[start_loc:end_loc]}`{message.content[end_loc:len(message.content)]}"
+                    title_desc = f"""
 Phrase: {phrase}
 Message Author: {message.author}
 
 **Message:** {new_message_content}
 [Click to go to the Message]({message.jump_url})
 """
-                embed = await ex.create_embed(title="Phrase Found", color=ex.get_random_color(), title_desc=title_desc)
-                await dm_channel.send(embed=embed)
+                    embed = await ex.create_embed(title="Phrase Found", color=ex.get_random_color(), title_desc=title_desc)
+                    await dm_channel.send(embed=embed)
         except:
             pass
 
@@ -66,7 +71,7 @@ Message Author: {message.author}
             if check_exists:
                 raise Exception
             await ex.conn.execute("INSERT INTO general.notifications(guildid,userid,phrase) VALUES($1, $2, $3)", ctx.guild.id, ctx.author.id, phrase.lower())
-            ex.cache.user_notifications.append([ctx.guild.id, ctx.author.id, phrase.lower()])
+            await ex.u_miscellaneous.add_user_notification_to_cache(ctx.guild.id, ctx.author.id, phrase.lower())
             await ctx.send(f"> **{ctx.author.display_name}, I added `{phrase}` to your notifications.**")
         except AttributeError:
             return await ctx.send(f"> **{ctx.author.display_name}, You are not allowed to use this command in DMs.**")
@@ -79,12 +84,10 @@ Message Author: {message.author}
         try:
             await ex.conn.execute("DELETE FROM general.notifications WHERE guildid=$1 AND userid=$2 AND phrase=$3", ctx.guild.id, ctx.author.id, phrase.lower())
             try:
-                ex.cache.user_notifications.remove([ctx.guild.id, ctx.author.id, phrase.lower()])
+                await ex.u_miscellaneous.remove_user_notification_from_cache(ctx.guild.id, ctx.author.id, phrase.lower())
             except AttributeError:
                 return await ctx.send(
                     f"> **{ctx.author.display_name}, You are not allowed to use this command in DMs.**")
-            except:
-                pass
             await ctx.send(f"> **{ctx.author.display_name}, if you were receiving notifications for that phrase, it has been removed.**")
         except Exception as e:
             log.console(e)
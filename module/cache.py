@@ -33,6 +33,10 @@ class Cache(commands.Cog):
         self.wolfram_per_minute = 0
         # Urban dictionary calls per minute
         self.urban_per_minute = 0
+        # idol posts that used a photo link from the photo pool per minute
+        self.photo_pool_hits_per_minute = 0
+        # idol posts that had to request a photo link from the API per minute
+        self.photo_pool_misses_per_minute = 0
         """
         Command Counter
         {
@@ -55,10 +59,12 @@ class Cache(commands.Cog):
             userid: [commands_used, time_since_last_command]
         }"""
         self.commands_used = {"reset_time": time.time()}
-        # phrases that will notify users [guild_id, user_id, phrase]
-        self.user_notifications = []
+        # phrases that will notify users { guild_id: { phrase: {user_id} } }
+        self.user_notifications = {}
         # mod mail user and channel {user_id: channel_id}
         self.mod_mail = {}
+        # mod mail channel and user {channel_id: user_id}
+        self.mod_mail_channels = {}
         # user ids banned from bot [user_id]
         self.bot_banned = []
         # server to channels being logged
@@ -74,9 +80,9 @@ class Cache(commands.Cog):
         
         """
         self.logged_channels = {}
-        # just a list of channels that are being logged with no correlation to the servers.
+        # just a set of channels that are being logged with no correlation to the servers.
         # this exists to check if a channel is logged much quicker.
-        self.list_of_logged_channels = []
+        self.logged_channel_ids = set()
         """
         Welcome Messages
         {
@@ -96,6 +102,13 @@ class Cache(commands.Cog):
         """
         self.temp_channels = {}
         """
+        Archived Channels
+        {
+        channel_id : drive_folder_id
+        }
+        """
+        self.archived_channels = {}
+        """
         NWord Counter
         {
         user_id : counter
@@ -107,11 +120,29 @@ class Cache(commands.Cog):
         self.idols = []
         # list of group objects
         self.groups = []
+        # idol and group objects by their ids
+        self.idols_by_id = {}  # { idol_id: idol }
+        self.groups_by_id = {}  # { group_id: group }
+        # idols to choose random idols from { (gender, max_difficulty): [idols with photos] }
+        self.idol_pools = {}
+        # members of a group that have photos { group_id: [idols] }
+        self.group_photo_members = {}
+        # exact names and aliases of idols and groups { name: [objects] }
+        self.idol_names = {}
+        self.group_names = {}
+        # aliases that only exist in a server { server_id: { alias: [objects] } }
+        self.idol_local_names = {}
+        self.group_local_names = {}
+        # finds the names and aliases of idols and groups inside a message (util.namematcher.NameMatcher)
+        self.idol_matcher = None
+        self.group_matcher = None
         # dict of restricted idol photo channels
         """
         channelid : [server_id, sendall]
         """
         self.restricted_channels = {}
+        # the channel of a server that all idol photos are sent to { server_id: channel_id }
+        self.send_here_channels = {}
         """
         messageid : [dead_link, userid, idolid, is_guessing_game]
         """
@@ -6,30 +6,6 @@ import discord
 
 # noinspection PyBroadException,PyPep8
 class Events(commands.Cog):
-    @staticmethod
-    async def catch_on_message_errors(method, message):
-        """Process Methods individually incase of errors. (This was created for commands in DMs)."""
-        try:
-            await method(message)
-        except Exception as e:
-            log.console(f"{e} - {method.__name__}")
-
-    @staticmethod
-    async def process_on_message(message):
-        try:
-            # increment message count per minute
-            ex.cache.messages_received_per_minute += 1
-            # delete messages that are in temp channels
-            await Events.catch_on_message_errors(ex.u_miscellaneous.delete_temp_messages, message)
-            # check for the n word
-            await Events.catch_on_message_errors(ex.u_miscellaneous.check_for_nword, message)
-            # check for self-assignable roles and process it.
-            await Events.catch_on_message_errors(ex.u_self_assign_roles.check_for_self_assignable_role, message)
-            # process the commands with their prefixes.
-            await Events.catch_on_message_errors(ex.u_miscellaneous.process_commands, message)
-        except Exception as e:
-            log.console(e)
-
     @staticmethod
     async def error(ctx, error):
         try:
@@ -86,7 +62,7 @@ class Events(commands.Cog):
     @staticmethod
     @ex.client.event
     async def on_message(message):
-        await Events.process_on_message(message)
+        await ex.u_message_router.process(message)
 
     @staticmethod
     @ex.client.event
@@ -98,7 +74,7 @@ class Events(commands.Cog):
             # the message has to be edited at least 60 seconds within it's creation.
             if difference.total_seconds() > 60:
                 return
-            await Events.process_on_message(message)
+            await ex.u_message_router.process(message, edited=True)
 
     @staticmethod
     @ex.client.event
@@ -132,8 +108,9 @@ class Events(commands.Cog):
     @staticmethod
     @ex.client.event
     async def on_raw_reaction_add(payload):
-        """Checks if a bot mod is deleting an idol photo."""
+        """Passes the reaction to anything waiting on the message and checks if a bot mod is deleting an idol photo."""
         try:
+            ex.u_reactions.dispatch(payload)
             message_id = payload.message_id
             user_id = payload.user_id
             emoji = payload.emoji
@@ -184,28 +161,18 @@ class Events(commands.Cog):
     @staticmethod
     @ex.client.event
     async def on_member_update(member_before, member_after):
-        if not member_before.bot:
-            before_roles = member_before.roles
-            after_roles = member_after.roles
-            added_roles = (list(set(after_roles) - set(before_roles)))
-            removed_roles = (list(set(before_roles) - set(after_roles)))
-            # if the user received the patron or super patron role, update cache
-            if added_roles:
-                for role in added_roles:
-                    if role.id == keys.patreon_super_role_id:
-                        ex.cache.patrons[member_after.id] = True
-                    if role.id == keys.patreon_role_id:
-                        ex.cache.patrons[member_after.id] = False
-            # if the user was removed from patron or super patron role, update cache
-            after_role_ids = [after_role.id for after_role in after_roles]
-            if removed_roles:
-                # only update if there were removed roles
-                if keys.patreon_super_role_id in after_role_ids:
-                    ex.cache.patrons[member_after.id] = True
-                elif keys.patreon_role_id in after_role_ids:
-                    ex.cache.patrons[member_after.id] = False
-                else:
-                    ex.cache.patrons.pop(member_after.id, None)
+        """Apply patron role changes in the support server to the patron cache as they happen."""
+        if member_before.bot or member_after.guild.id != int(keys.bot_support_server_id):
+            return
+        patron_role_ids = {keys.patreon_role_id, keys.patreon_super_role_id}
+        before_role_ids = {role.id for role in member_before.roles}
+        after_role_ids = {role.id for role in member_after.roles}
+        # only update if a patron or super patron role was added or removed
+        if (before_role_ids ^ after_role_ids) & patron_role_ids:
+            try:
+                await ex.u_patreon.update_patron_status(member_after.id, after_role_ids)
+            except Exception as e:
+                log.console(f"{e} - on_member_update")
 
     @staticmethod
     @ex.client.event
@@ -10,6 +10,18 @@ class ImproperFormat(Exception):
         super(ImproperFormat, self).__init__("An Invalid Format was given.")
 
 
+class NoIdolFound(Exception):
+    """No idol could be chosen."""
+    def __init__(self):
+        super(NoIdolFound, self).__init__("There are no idols that meet the requirements.")
+
+
+class APIUnavailable(Exception):
+    """The API could not be reached."""
+    def __init__(self):
+        super(APIUnavailable, self).__init__("The API is currently unavailable.")
+
+
 class NoTimeZone(Exception):
     """No Timezone was found."""
 
@@ -187,6 +187,9 @@ idol_banner_location = os.getenv("IDOL_BANNER_LOCATION")
 # Bias Game Folder Location
 bias_game_location = os.getenv("BIAS_GAME_LOCATION")
 
+# Cache Snapshot Location
+cache_snapshot_location = os.getenv("CACHE_SNAPSHOT_LOCATION") or "temp/cache_snapshot.bin"
+
 # Weverse
 weverse_auth_token = os.getenv("WEVERSE_AUTH")
 weverse_image_folder = os.getenv("WEVERSE_IMAGE_FOLDER")
@@ -13,6 +13,8 @@ class Irene:
         """Start the bot."""
         self.create_util_objects()  # create sub-classes for Utility
         ex.u_data_dog.initialize_data_dog()  # initialize the class for DataDog metrics
+        # serve from the last saved cache until the cache is rebuilt from the database.
+        ex.u_snapshot.load_snapshot()
         # all active blackjack games are also deleted on db start, current session stats refreshed.
         # cache is reset in the on_ready event.
         ex.u_database.set_start_up_connection.start()
@@ -64,6 +66,16 @@ class Irene:
         module.Music.Music().check_voice_clients.start()
         # Update Cache Every 12 hours
         ex.u_cache.update_cache.start()
+        # Keep the cache in sync with changes made to the database outside of Irene.
+        ex.u_change_feed.check_change_feed.start()
+        # Save the cache to disk every 30 minutes and on shut down for faster restarts.
+        ex.u_snapshot.save_snapshot_loop.start()
+        # Write idol call counts and command statistics to the database in batches and on shut down.
+        ex.u_write_behind.flush_loop.start()
+        # Keep photo links of the most called idols ready before they are requested.
+        ex.u_photo_pool.refill_hot_idols.start()
+        # Delete archived photos once they have been uploaded.
+        ex.u_archive.clean_up_photos.start()
         # Start a loop that sends cache information to DataDog.
         ex.u_cache.send_cache_data_to_data_dog.start()
         # after intents was pushed in place, d.py cache loaded a lot slower and patrons are not added properly.
@@ -77,14 +89,42 @@ class Irene:
     @staticmethod
     def add_listeners():
         """Add Listener Events."""
-        module.keys.client.add_listener(module.GroupMembers.GroupMembers.on_message2, 'on_message')
-        module.keys.client.add_listener(module.Archive.Archive.on_message, 'on_message')
-        module.keys.client.add_listener(module.Logging.Logging.on_message_log, 'on_message')
         module.keys.client.add_listener(module.Logging.Logging.logging_on_message_edit, 'on_message_edit')
         module.keys.client.add_listener(module.Logging.Logging.logging_on_message_delete, 'on_message_delete')
-        module.keys.client.add_listener(module.Miscellaneous.Miscellaneous.on_message_notifications, 'on_message')
-        module.keys.client.add_listener(module.BotMod.BotMod.mod_on_message, 'on_message')
-        module.keys.client.add_listener(module.CustomCommands.CustomCommands.process_custom_commands, 'on_message')
+
+        # every message goes through the message router, which only runs the handlers whose predicate matches.
+        router = ex.u_message_router
+        # delete messages that are in temp channels
+        router.add_handler(ex.u_miscellaneous.delete_temp_messages,
+                           lambda m: m.channel_id in ex.cache.temp_channels, on_edit=True)
+        # check for the n word (both words start with 'nigg')
+        router.add_handler(ex.u_miscellaneous.check_for_nword,
+                           lambda m: not m.is_bot and 'nigg' in m.lower_content, on_edit=True)
+        # check for self-assignable roles and process it.
+        router.add_handler(ex.u_self_assign_roles.check_for_self_assignable_role,
+                           lambda m: (ex.cache.assignable_roles.get(m.guild_id) or {}).get('channel_id') == m.channel_id,
+                           on_edit=True)
+        # process the commands with their prefixes or a mention of the bot.
+        router.add_handler(ex.u_miscellaneous.process_commands,
+                           lambda m: not m.is_bot and (m.without_prefix is not None or m.content.startswith("<@")),
+                           on_edit=True)
+        router.add_handler(module.GroupMembers.GroupMembers.on_message2,
+                           lambda m: not m.is_bot and m.lower_without_prefix and m.lower_without_prefix != "null"
+                           and m.channel_id not in ex.cache.temp_channels)
+        router.add_handler(module.CustomCommands.CustomCommands.process_custom_commands,
+                           lambda m: not m.is_bot and not m.is_banned and m.lower_without_prefix is not None
+                           and m.lower_without_prefix in (ex.cache.custom_commands.get(m.guild_id) or {}))
+        router.add_handler(module.Archive.Archive.on_message,
+                           lambda m: not m.is_bot and m.channel_id in ex.cache.archived_channels)
+        router.add_handler(module.Logging.Logging.on_message_log,
+                           lambda m: not m.is_bot and m.channel_id in ex.cache.logged_channel_ids)
+        router.add_handler(module.Miscellaneous.Miscellaneous.on_message_notifications,
+                           lambda m: not m.is_bot and m.guild_id in ex.cache.user_notifications)
+        router.add_handler(module.BotMod.BotMod.mod_on_message,
+                           lambda m: m.author_id != module.keys.bot_id and
+                           ((m.guild_id is None and m.author_id in ex.cache.mod_mail) or
+                            m.channel_id in ex.cache.mod_mail_channels) and
+                           'closedm' not in m.content and 'createdm' not in m.content)
 
     @staticmethod
     def add_cogs():
@@ -138,6 +178,14 @@ class Irene:
         ex.u_self_assign_roles = util.selfassignroles.SelfAssignRoles()
         ex.u_reminder = util.reminder.Reminder()
         ex.u_guessinggame = util.guessinggame.GuessingGame()
+        ex.u_change_feed = util.changefeed.ChangeFeed()
+        ex.u_snapshot = util.snapshot.Snapshot()
+        ex.u_photo_pool = util.photopool.PhotoPool()
+        ex.u_api = util.api.API()
+        ex.u_write_behind = util.writebehind.WriteBehind()
+        ex.u_reactions = util.reactions.ReactionRouter()
+        ex.u_message_router = util.messagerouter.MessageRouter()
+        ex.u_archive = util.archive.Archive()
 
 
 if __name__ == '__main__':
@@ -1,2 +1,4 @@
 from util import biasgame, blackjack, cache, currency, customcommands, database, datadog, groupmembers, lastfm, levels,\
-    logging, miscellaneous, moderator, patreon, reminder, selfassignroles, twitter, weverse, guessinggame
+    logging, miscellaneous, moderator, patreon, reminder, selfassignroles, twitter, weverse, guessinggame, changefeed, snapshot,\
+    namematcher, photopool, api, writebehind, reactions, pagination, messagerouter,\
+    archive
@@ -0,0 +1,218 @@
+from Utility import resources as ex
+from module import logger as log
+from module.keys import translate_private_key, api_port
+import aiohttp
+import asyncio
+import collections
+import random
+import time
+
+
+class CircuitBreaker:
+    """Stops requests to an endpoint that keeps failing or responding slowly, and lets one request through
+    every so often to check if it has recovered.
+
+    closed -> requests are sent.
+    open -> requests are rejected until the open time has passed.
+    half open -> a single request is sent. If it succeeds the breaker closes, otherwise it opens for longer.
+    """
+    def __init__(self, slow_call_seconds, window_size=20, minimum_calls=10, failure_rate=0.5, open_seconds=10,
+                 max_open_seconds=120):
+        self.slow_call_seconds = slow_call_seconds  # successful calls slower than this still count as failures.
+        self.results = collections.deque(maxlen=window_size)  # True for every call that succeeded in time.
+        self.minimum_calls = minimum_calls
+        self.failure_rate = failure_rate
+        self.base_open_seconds = open_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def is_open(self):
+        """Whether requests are currently being rejected."""
+        if self.opened_at is None:
+            return False
+        return self.probing or time.time() - self.opened_at < self.open_seconds
+
+    def allow_request(self):
+        """Check if a request may be sent. After the open time passes, only one request is let through."""
+        if self.opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        self.probing = True
+        return True
+
+    def record(self, succeeded, latency, probe=False):
+        """Record the result of a request.
+
+        :param probe: whether the request was the one let through after the open time passed.
+        """
+        succeeded = succeeded and latency < self.slow_call_seconds
+        if probe:
+            self.probing = False
+            if succeeded:
+                self.close()
+            else:
+                # the endpoint has not recovered, so wait longer before checking again.
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self.opened_at = time.time()
+            return
+        if self.opened_at is not None:
+            # a request that started before the breaker opened says nothing about whether it has recovered.
+            return
+        self.results.append(succeeded)
+        if self.opened_at is None and len(self.results) >= self.minimum_calls:
+            failures = self.results.count(False)
+            if failures / len(self.results) >= self.failure_rate:
+                self.opened_at = time.time()
+                log.console(f"API Circuit Breaker opened after {failures} failed or slow requests.")
+
+    def end_probe(self):
+        """Let another request through if the request that was let through ended without recording a result."""
+        self.probing = False
+
+    def close(self):
+        self.opened_at = None
+        self.open_seconds = self.base_open_seconds
+        self.results.clear()
+        log.console("API Circuit Breaker closed.")
+
+
+# a response with the body already read, since the connection is released once the request finishes.
+APIResponse = collections.namedtuple("APIResponse", ["status", "url", "body"])
+
+
+# noinspection PyBroadException,PyPep8
+class API:
+    """Client for Irene's API.
+
+    Requests are limited to a few at once, retried with jittered exponential backoff on temporary errors
+    until their deadline, and rejected immediately while the endpoint's circuit breaker is open.
+    """
+    max_concurrent_requests = 8
+    retry_statuses = (500, 502, 503, 504)
+    base_backoff = 0.25
+    max_backoff = 4
+    """
+    {
+    endpoint: [deadline in seconds, slow call in seconds]
+    }
+    """
+    endpoints = {
+        "photos": [10, 5],
+        "translate": [15, 8]
+    }
+
+    def __init__(self):
+        self.request_limit = asyncio.Semaphore(self.max_concurrent_requests)
+        self.breakers = {endpoint: CircuitBreaker(slow_call_seconds=slow_call) for endpoint, (deadline, slow_call)
+                         in self.endpoints.items()}
+        # responses per minute { (endpoint, status): amount }. timeouts and connection errors have a status of 0.
+        self.status_counts = collections.Counter()
+
+    @staticmethod
+    def get_end_point(path):
+        if ex.test_bot:
+            return f"https://api.irenebot.com/{path}"
+        return f"http://127.0.0.1:{api_port}/{path}"
+
+    def is_available(self, endpoint):
+        """Whether the circuit breaker of an endpoint is letting requests through."""
+        return not self.breakers[endpoint].is_open
+
+    async def post(self, endpoint, path, data, body_statuses=(200,), retries=3):
+        """Send a POST request to the API.
+
+        :param endpoint: the endpoint in API.endpoints that the deadline and circuit breaker belong to.
+        :param path: the path of the request.
+        :param data: the form data to send.
+        :param body_statuses: statuses to read the body of. The body of other responses is not downloaded.
+        :param retries: amount of times to retry a temporary error before the deadline.
+        :returns: APIResponse
+        :raises ex.exceptions.APIUnavailable: if the circuit breaker is open or the API did not respond in time.
+        """
+        breaker = self.breakers[endpoint]
+        deadline = time.time() + self.endpoints[endpoint][0]
+        attempt = 0
+        while True:
+            if time.time() >= deadline or not breaker.allow_request():
+                raise ex.exceptions.APIUnavailable
+            # requests are only let through an opened breaker as the probe.
+            probe = breaker.opened_at is not None
+            try:
+                async with self.request_limit:
+                    # the deadline and latency start after waiting for the semaphore.
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise ex.exceptions.APIUnavailable
+                    status = 0
+                    start_time = time.time()
+                    try:
+                        async with ex.session.post(self.get_end_point(path), data=data,
+                                                   timeout=aiohttp.ClientTimeout(total=remaining)) as r:
+                            status = r.status
+                            body = await r.text() if status in body_statuses else None
+                            response = APIResponse(status, r.url, body)
+                    except Exception as e:
+                        # timeouts and connection errors.
+                        log.console(f"{e} - API.post {path}")
+                        response = None
+                    latency = time.time() - start_time
+                self.status_counts[(endpoint, status)] += 1
+                if endpoint == "photos":
+                    ex.cache.bot_api_idol_calls += 1
+                else:
+                    ex.cache.bot_api_translation_calls += 1
+                temporary_error = status == 0 or status in self.retry_statuses
+                breaker.record(not temporary_error, latency, probe)
+            finally:
+                # a probe that ended without a result (deadline or cancelled) must not keep the breaker open.
+                if probe:
+                    breaker.end_probe()
+            if not temporary_error:
+                return response
+            if attempt >= retries:
+                if response:
+                    return response
+                raise ex.exceptions.APIUnavailable
+            # full jitter keeps retries from many requests from arriving at the same time.
+            backoff = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+            if time.time() + backoff >= deadline:
+                if response:
+                    return response
+                raise ex.exceptions.APIUnavailable
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+    async def get_idol_photo(self, idol_id, guessing_game=False, retries=3):
+        """Request a random photo of an idol. Videos (415) return the information of the file in the body."""
+        data = {
+            'p_key': translate_private_key,
+            'no_group_photos': int(guessing_game)
+        }
+        return await self.post("photos", f"photos/{idol_id}", data, body_statuses=(415,), retries=retries)
+
+    async def translate(self, text, src_lang, target_lang):
+        """Translate text with Papago."""
+        data = {
+            'text': text,
+            'src_lang': src_lang,
+            'target_lang': target_lang,
+            'p_key': translate_private_key
+        }
+        return await self.post("translate", "translate", data)
+
+    def get_metrics(self):
+        """Get the metrics of the last minute and reset the status counts.
+
+        :returns: { metric_name: value }
+        """
+        metrics = {}
+        for (endpoint, status), amount in self.status_counts.items():
+            metrics[f"api_{endpoint}_status_{status}"] = amount
+        for endpoint, breaker in self.breakers.items():
+            metrics[f"api_{endpoint}_circuit_open"] = int(breaker.is_open)
+        self.status_counts.clear()
+        return metrics
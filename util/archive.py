@@ -0,0 +1,201 @@
+from Utility import resources as ex
+from discord.ext import tasks
+from module import logger as log
+import aiofiles
+import asyncio
+import discord
+import hashlib
+import os
+import secrets
+
+
+# noinspection PyBroadException,PyPep8
+class Archive:
+    """Downloads images from archived channels into the Photos folder, where an external program uploads them
+    to google drive.
+
+    Downloads go through a bounded queue that a few workers take from, so a large backfill does not hold up
+    the bot. Files are named by the drive they go to and the hash of their content, so an image that is already
+    waiting to be uploaded to the same drive is not downloaded twice.
+    """
+    photo_folder = "Photos"
+    worker_count = 4
+    queue_size = 100  # adding to a full queue waits, so a backfill can not get far ahead of the downloads.
+    chunk_size = 64 * 1024
+    checkpoint_interval = 100  # messages between saving the progress of a backfill.
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)  # [url, drive_id, channel_id, future or None]
+        self.workers = []
+        self.downloading = set()  # file names that are currently being saved.
+        self.pending_files = set()  # file names in the photo folder that have not been uploaded yet.
+
+    def start_workers(self):
+        """Start the download workers if they are not running."""
+        self.workers = [worker for worker in self.workers if not worker.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self.download_worker()))
+
+    async def download_worker(self):
+        """Download urls from the queue until the bot shuts down."""
+        while True:
+            url, drive_id, channel_id, future = await self.queue.get()
+            try:
+                await self.download_url(url, drive_id, channel_id)
+            except Exception as e:
+                log.console(f"{e} - Archive.download_worker")
+            finally:
+                if future and not future.done():
+                    future.set_result(None)
+                self.queue.task_done()
+
+    @staticmethod
+    def get_urls(message):
+        """Get the urls of the attachments and embeds of a message without the extra parts twitter adds."""
+        urls = [file.url for file in message.attachments]
+        urls += [embed.url for embed in message.embeds if str(embed.url) != "Embed.Empty"]
+        clean_urls = []
+        for url in urls:
+            if "%27%3E" in url:
+                url = url[0:url.find("%27%3E") - 1]
+            if ":large" in url:
+                url = url[0:url.find(":large")]
+            clean_urls.append(url)
+        return clean_urls
+
+    @staticmethod
+    def get_file_type(url):
+        """Get the url to download and the file type of an image url.
+
+        :returns: (url, file type) or (url, None) if the url is not an image.
+        """
+        file_type = url[len(url) - 4:len(url)]
+        large_position = url.find(":large")
+        if large_position != -1:
+            file_type = url[len(url) - 10:len(url) - 6]
+            url = f"{url[0:large_position - 1]}:orig"
+        format_position = url.find('?format=')
+        if format_position != -1:
+            return url, f".{url[format_position + 8:format_position + 11]}"
+        if file_type in (".jpg", ".gif", ".png"):
+            return url, file_type
+        return url, None
+
+    async def archive_message(self, message, drive_id, track=False):
+        """Add the images of a message to the download queue.
+
+        :param track: whether to return futures that finish when each image is done.
+        :returns: list of futures (empty unless track is True)
+        """
+        urls = self.get_urls(message)
+        if urls:
+            self.start_workers()
+        futures = []
+        for url in urls:
+            future = asyncio.get_event_loop().create_future() if track else None
+            if track:
+                futures.append(future)
+            await self.queue.put([url, drive_id, message.channel.id, future])
+        return futures
+
+    async def download_url(self, url, drive_id, channel_id):
+        """Stream an image into the photo folder and add it to archive.ArchivedChannels unless it already is."""
+        url, file_type = self.get_file_type(url)
+        if not file_type:
+            return
+        temp_location = f"{self.photo_folder}/{secrets.token_hex(8)}.tmp"
+        content_hash = hashlib.sha256()
+        try:
+            async with ex.session.get(url) as r:
+                if r.status != 200:
+                    return
+                async with aiofiles.open(temp_location, mode='wb') as fd:
+                    async for chunk in r.content.iter_chunked(self.chunk_size):
+                        content_hash.update(chunk)
+                        await fd.write(chunk)
+            # the same image archived to another drive is a separate upload.
+            file_name = f"{drive_id}_{content_hash.hexdigest()}{file_type}"
+            if file_name in self.downloading or file_name in self.pending_files:
+                return
+            self.downloading.add(file_name)
+            try:
+                if await ex.conn.fetchval("SELECT COUNT(*) FROM archive.ArchivedChannels WHERE filename = $1",
+                                          file_name):
+                    return
+                os.replace(temp_location, f"{self.photo_folder}/{file_name}")
+                await ex.conn.execute("INSERT INTO archive.ArchivedChannels VALUES($1,$2,$3,$4)", file_name, file_type,
+                                      drive_id, channel_id)
+                self.pending_files.add(file_name)
+            finally:
+                self.downloading.discard(file_name)
+        finally:
+            if os.path.exists(temp_location):
+                os.remove(temp_location)
+
+    @staticmethod
+    async def get_checkpoint(channel_id):
+        """Get the id of the last message of a channel that was backfilled.
+        archive.historycheckpoints is created by migrations/001_archive_history_checkpoints.sql."""
+        return await ex.conn.fetchval("SELECT messageid FROM archive.historycheckpoints WHERE channelid = $1",
+                                      channel_id)
+
+    @staticmethod
+    async def save_checkpoint(channel_id, message_id):
+        await ex.conn.execute("INSERT INTO archive.historycheckpoints(channelid, messageid) VALUES($1, $2) "
+                              "ON CONFLICT (channelid) DO UPDATE SET messageid = $2", channel_id, message_id)
+
+    async def backfill(self, channel, drive_id, after=None):
+        """Add the images of the previous messages of a channel from oldest to newest.
+
+        Progress is saved every few messages once their images are downloaded, so a backfill that was
+        interrupted continues from where it stopped.
+
+        :param after: datetime to start from. Messages before the saved progress are skipped either way.
+        """
+        checkpoint = await self.get_checkpoint(channel.id)
+        if checkpoint and (not after or discord.utils.snowflake_time(checkpoint) > after):
+            after = discord.Object(id=checkpoint)
+        last_message_id = None
+        counter = 0
+        # only wait on the images of this backfill, not on the messages archived while it runs.
+        futures = []
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            futures += await self.archive_message(message, drive_id, track=True)
+            last_message_id = message.id
+            counter += 1
+            if counter % self.checkpoint_interval == 0:
+                if futures:
+                    await asyncio.wait(futures)
+                    futures = []
+                await self.save_checkpoint(channel.id, last_message_id)
+        if futures:
+            await asyncio.wait(futures)
+        if last_message_id:
+            await self.save_checkpoint(channel.id, last_message_id)
+
+    @tasks.loop(seconds=0, minutes=5, hours=0, reconnect=True)
+    async def clean_up_photos(self):
+        """Looped every 5 minutes to delete the photos that were uploaded and removed from archive.ArchivedChannels."""
+        try:
+            if not self.pending_files or not ex.conn:
+                return
+            file_names = list(self.pending_files)
+            rows = await ex.conn.fetch("SELECT filename FROM archive.ArchivedChannels WHERE filename = ANY($1)",
+                                       file_names)
+            remaining = {row[0] for row in rows}
+            for file_name in file_names:
+                if file_name in remaining:
+                    continue
+                try:
+                    os.remove(f"{self.photo_folder}/{file_name}")
+                except FileNotFoundError:
+                    pass
+                self.pending_files.discard(file_name)
+        except Exception as e:
+            log.console(f"{e} - Archive.clean_up_photos")
+
+    @clean_up_photos.before_loop
+    async def find_pending_photos(self):
+        """Check the photos left in the folder from before Irene started on the first clean up."""
+        self.pending_files |= {file_name for file_name in os.listdir(self.photo_folder)
+                               if file_name != "placeholder.txt"}
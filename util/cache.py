@@ -2,6 +2,8 @@ from Utility import resources as ex
 from discord.ext import tasks
 from module import logger as log
 from module.keys import dead_image_channel_id
+import contextvars
+import sys
 import time
 import asyncio
 import datetime
@@ -10,175 +12,364 @@ import datetime
 # noinspection PyBroadException,PyPep8
 class Cache:
 
+    # statistics of the loader currently running in this task, used to count the rows it fetched.
+    current_loader = contextvars.ContextVar('current_loader', default=None)
+
+    def __init__(self):
+        """
+        Statistics of every cache loader from its last successful build.
+        {
+        loader_name: {
+                    duration: seconds,
+                    rows: rows fetched from the database,
+                    entries: entries in the cache attributes it creates,
+                    memory: approximate bytes of the cache attributes it creates,
+                    last_refresh: unix time
+                    },
+        ...
+        }
+        """
+        self.loader_stats = {}
+        # whether the cache has been built from the database at least once.
+        self.cache_created = False
+        # ({ idol_id: [group_ids] }, { group_id: [idol_ids] }) read once for the idol and group objects of a build.
+        self.idol_to_group = None
+
+    def get_cache_loaders(self):
+        """Get the cache loaders, the loaders they depend on, and the ex.cache attributes they create.
+
+        { loader_name: [method, [dependency_names], [cache_attributes]] }
+        A loader only starts once all of its dependencies have finished.
+        """
+        return {
+            "Idol Photo Count": [self.update_idols, [], ['idol_photos']],
+            "Group Photo Count": [self.update_groups, [], ['group_photos']],
+            "User Notifications": [self.update_user_notifications, [], ['user_notifications']],
+            # after intents was pushed in place, d.py cache loaded a lot slower and patrons are not added properly.
+            # therefore it must be looped instead.
+            # "Patrons": [self.update_patreons, [], ['patrons']],
+            "ModMail": [self.update_mod_mail, [], ['mod_mail', 'mod_mail_channels']],
+            "Bot Bans": [self.update_bot_bans, [], ['bot_banned']],
+            "Logged Channels": [self.update_logging_channels, [], ['logged_channels', 'logged_channel_ids']],
+            "Server Prefixes": [self.update_server_prefixes, [], ['server_prefixes']],
+            "Welcome Messages": [self.update_welcome_message_cache, [], ['welcome_messages']],
+            "Temp Channels": [self.update_temp_channels, [], ['temp_channels']],
+            "Archived Channels": [self.update_archived_channels, [], ['archived_channels']],
+            "NWord Counter": [self.update_n_word_counter, [], ['n_word_counter']],
+            "Command Counter": [self.update_command_counter, [], ['command_counter']],
+            "Idol To Group": [self.load_idol_to_group, [], []],
+            # idol objects need idol_photos and group objects need group_photos.
+            "Idol Objects": [self.create_idol_cache, ["Idol Photo Count", "Idol To Group"],
+                             ['idols', 'idol_names', 'idol_local_names', 'idol_matcher', 'idols_by_id', 'idol_pools']],
+            "Group Objects": [self.create_group_cache, ["Group Photo Count", "Idol To Group"],
+                              ['groups', 'group_names', 'group_local_names', 'group_matcher', 'groups_by_id',
+                               'group_photo_members']],
+            "Restricted Idol Channels": [self.create_restricted_channel_cache, [],
+                                         ['restricted_channels', 'send_here_channels']],
+            "Dead Links": [self.create_dead_link_cache, [], ['dead_image_cache']],
+            "Bot Status": [self.create_bot_status_cache, [], ['bot_statuses']],
+            "Custom Commands": [self.create_bot_command_cache, [], ['custom_commands']],
+            "Weverse Text Channels": [self.create_weverse_channel_cache, [], ['weverse_channels']],
+            "Self-Assignable Roles": [self.create_self_assignable_role_cache, [], ['assignable_roles']],
+            "Reminders": [self.create_reminder_cache, [], ['reminders']],
+            "Timezones": [self.create_timezone_cache, [], ['timezones']],
+            "Guessing Game Scores": [self.create_guessing_game_cache, [], ['guessing_game_counter']]
+        }
+
     @staticmethod
-    async def process_cache_time(method, name):
-        """Process the cache time."""
+    def count_rows(records):
+        """Add the amount of rows fetched to the statistics of the loader that is currently running.
+        Returns the records so it can wrap a fetch."""
+        loader_rows = Cache.current_loader.get()
+        if loader_rows is not None and records:
+            loader_rows[0] += len(records)
+        return records
+
+    async def process_cache_time(self, method, name, attributes=None):
+        """Process the cache time and record the statistics of the loader.
+
+        :param method: The loader.
+        :param name: Name of the loader.
+        :param attributes: ex.cache attributes the loader creates. Taken from the cache loaders if not given.
+        """
+        if attributes is None:
+            loader = self.get_cache_loaders().get(name)
+            attributes = loader[2] if loader else []
+        loader_rows = [0]
+        token = self.current_loader.set(loader_rows)
         past_time = time.time()
-        result = await method()
+        try:
+            result = await method()
+        finally:
+            self.current_loader.reset(token)
+        duration = time.time() - past_time
         if result is None or result:  # expecting False on methods that fail to load, do not simplify None.
-            log.console(f"Cache for {name} Created in {await ex.u_miscellaneous.get_cooldown_time(time.time() - past_time)}.")
+            entries = 0
+            for attribute in attributes:
+                value = getattr(ex.cache, attribute)
+                entries += len(value) if value else 0
+            self.loader_stats[name] = {
+                "duration": duration,
+                "rows": loader_rows[0],
+                "entries": entries,
+                "memory": sum(self.get_object_size(getattr(ex.cache, attribute)) for attribute in attributes),
+                "last_refresh": time.time()
+            }
+            log.console(f"Cache for {name} Created in {await ex.u_miscellaneous.get_cooldown_time(duration)}.")
         return result
 
     async def create_cache(self):
-        """Create the general cache on startup"""
+        """Create the general cache on startup
+
+        Loaders without a dependency between them are run concurrently.
+        ex.conn is a pool, so every concurrent loader runs its queries on a separate connection.
+        """
+        # a change received while a loader runs could be applied to the old cache and lost in the swap.
+        ex.u_change_feed.pause()
+        try:
+            await self.build_cache()
+        finally:
+            self.idol_to_group = None
+            ex.u_change_feed.resume()
+
+    async def build_cache(self):
+        """Run every cache loader in dependency order."""
         past_time = time.time()
-        await self.process_cache_time(self.update_idols, "Idol Photo Count")
-        await self.process_cache_time(self.update_groups, "Group Photo Count")
-        await self.process_cache_time(self.update_user_notifications, "User Notifications")
-        # after intents was pushed in place, d.py cache loaded a lot slower and patrons are not added properly.
-        # therefore it must be looped instead.
-        # await self.process_cache_time(self.update_patreons, "Patrons")
-        await self.process_cache_time(self.update_mod_mail, "ModMail")
-        await self.process_cache_time(self.update_bot_bans, "Bot Bans")
-        await self.process_cache_time(self.update_logging_channels, "Logged Channels")
-        await self.process_cache_time(self.update_server_prefixes, "Server Prefixes")
-        await self.process_cache_time(self.update_welcome_message_cache, "Welcome Messages")
-        await self.process_cache_time(self.update_temp_channels, "Temp Channels")
-        await self.process_cache_time(self.update_n_word_counter, "NWord Counter")
-        await self.process_cache_time(self.update_command_counter, "Command Counter")
-        await self.process_cache_time(self.create_idol_cache, "Idol Objects")
-        await self.process_cache_time(self.create_group_cache, "Group Objects")
-        await self.process_cache_time(self.create_restricted_channel_cache, "Restricted Idol Channels")
-        await self.process_cache_time(self.create_dead_link_cache, "Dead Links")
-        await self.process_cache_time(self.create_bot_status_cache, "Bot Status")
-        await self.process_cache_time(self.create_bot_command_cache, "Custom Commands")
-        await self.process_cache_time(self.create_weverse_channel_cache, "Weverse Text Channels")
-        await self.process_cache_time(self.create_self_assignable_role_cache, "Self-Assignable Roles")
-        await self.process_cache_time(self.create_reminder_cache, "Reminders")
-        await self.process_cache_time(self.create_timezone_cache, "Timezones")
-        await self.process_cache_time(self.create_guessing_game_cache, "Guessing Game Scores")
+        loaders = self.get_cache_loaders()
+        loader_tasks = {}
+
+        async def run_loader(loader_name):
+            """Wait for the dependencies of a loader and then run it."""
+            method, dependencies, attributes = loaders.get(loader_name)
+            if dependencies:
+                await asyncio.gather(*[loader_tasks.get(dependency) for dependency in dependencies])
+            await self.process_cache_time(method, loader_name, attributes)
+
+        # every task is created before any of them start, so all dependencies exist by the time they are awaited.
+        for name in loaders:
+            loader_tasks[name] = asyncio.create_task(run_loader(name))
+        results = await asyncio.gather(*loader_tasks.values(), return_exceptions=True)
+        for name, result in zip(loader_tasks, results):
+            if isinstance(result, Exception):
+                log.console(f"Cache for {name} Failed to Load - {result}")
+
         if not ex.test_bot and not ex.weverse_client.cache_loaded:
             # noinspection PyUnusedLocal
-            task = asyncio.create_task(self.process_cache_time(ex.weverse_client.start, "Weverse"))
+            task = asyncio.create_task(self.process_cache_time(ex.weverse_client.start, "Weverse", []))
+        self.cache_created = True
+        critical_path, critical_path_time = self.get_critical_path(loaders)
+        log.console(f"Cache Critical Path ({' -> '.join(critical_path)}) took "
+                    f"{await ex.u_miscellaneous.get_cooldown_time(critical_path_time)}.")
         log.console(f"Cache Completely Created in {await ex.u_miscellaneous.get_cooldown_time(time.time() - past_time)}.")
 
+    @staticmethod
+    def get_object_size(obj):
+        """Get the approximate amount of bytes an object and everything it references takes in memory.
+        Objects shared between several references are only counted once."""
+        seen = set()
+        size = 0
+        objects = [obj]
+        while objects:
+            current = objects.pop()
+            if id(current) in seen:
+                continue
+            seen.add(id(current))
+            size += sys.getsizeof(current)
+            if isinstance(current, dict):
+                objects.extend(current.keys())
+                objects.extend(current.values())
+            elif isinstance(current, (list, tuple, set, frozenset)):
+                objects.extend(current)
+            elif hasattr(current, '__slots__'):
+                objects.extend(getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot))
+            elif hasattr(current, '__dict__'):
+                objects.append(current.__dict__)
+        return size
+
+    def get_critical_path(self, loaders):
+        """Get the longest chain of dependent loaders and the time it took based on the last build.
+
+        :returns: ([loader_name, ...], seconds)
+        """
+        path_times = {}  # { loader_name: [time of the slowest chain ending at the loader, chain] }
+
+        def get_path(loader_name):
+            if loader_name not in path_times:
+                slowest_time, slowest_chain = 0, []
+                for dependency in loaders.get(loader_name)[1]:
+                    dependency_time, dependency_chain = get_path(dependency)
+                    if dependency_time > slowest_time:
+                        slowest_time, slowest_chain = dependency_time, dependency_chain
+                loader_time = (self.loader_stats.get(loader_name) or {}).get("duration") or 0
+                path_times[loader_name] = [slowest_time + loader_time, slowest_chain + [loader_name]]
+            return path_times.get(loader_name)
+
+        critical_time, critical_path = 0, []
+        for name in loaders:
+            path_time, path = get_path(name)
+            if path_time >= critical_time:
+                critical_time, critical_path = path_time, path
+        return critical_path, critical_time
+
     @staticmethod
     async def create_guessing_game_cache():
-        ex.cache.guessing_game_counter = {}
-        all_scores = await ex.conn.fetch("SELECT userid, easy, medium, hard FROM stats.guessinggame")
+        guessing_game_counter = {}
+        all_scores = Cache.count_rows(await ex.conn.fetch("SELECT userid, easy, medium, hard FROM stats.guessinggame"))
         for user_id, easy_score, medium_score, hard_score in all_scores:
-            ex.cache.guessing_game_counter[user_id] = {"easy": easy_score, "medium": medium_score, "hard": hard_score}
+            guessing_game_counter[user_id] = {"easy": easy_score, "medium": medium_score, "hard": hard_score}
+        ex.cache.guessing_game_counter = guessing_game_counter
 
     @staticmethod
     async def create_timezone_cache():
-        ex.cache.timezones = {}  # reset cache
-        timezones = await ex.u_reminder.get_all_timezones_from_db()
-        for user_id, timezone in timezones:
-            ex.cache.timezones[user_id] = timezone
+        timezones = {}
+        for user_id, timezone in Cache.count_rows(await ex.u_reminder.get_all_timezones_from_db()):
+            timezones[user_id] = timezone
+        ex.cache.timezones = timezones
 
     @staticmethod
     async def create_reminder_cache():
         """Create cache for reminders"""
-        ex.cache.reminders = {}  # reset cache
-        all_reminders = await ex.u_reminder.get_all_reminders_from_db()
+        reminders = {}
+        all_reminders = Cache.count_rows(await ex.u_reminder.get_all_reminders_from_db())
         for reason_id, user_id, reason, time_stamp in all_reminders:
             reason_list = [reason_id, reason, time_stamp]
-            user_reminder = ex.cache.reminders.get(user_id)
+            user_reminder = reminders.get(user_id)
             if user_reminder:
                 user_reminder.append(reason_list)
             else:
-                ex.cache.reminders[user_id] = [reason_list]
+                reminders[user_id] = [reason_list]
+        ex.cache.reminders = reminders
 
     @staticmethod
     async def create_self_assignable_role_cache():
         """Create cache for self assignable roles"""
-        all_roles = await ex.conn.fetch("SELECT roleid, rolename, serverid FROM selfassignroles.roles")
-        all_channels = await ex.conn.fetch("SELECT channelid, serverid FROM selfassignroles.channels")
+        all_roles = Cache.count_rows(await ex.conn.fetch("SELECT roleid, rolename, serverid FROM selfassignroles.roles"))
+        all_channels = Cache.count_rows(await ex.conn.fetch("SELECT channelid, serverid FROM selfassignroles.channels"))
+        assignable_roles = {}
         for role_id, role_name, server_id in all_roles:
-            cache_info = ex.cache.assignable_roles.get(server_id)
+            cache_info = assignable_roles.get(server_id)
             if not cache_info:
-                ex.cache.assignable_roles[server_id] = {}
-                cache_info = ex.cache.assignable_roles.get(server_id)
+                assignable_roles[server_id] = {}
+                cache_info = assignable_roles.get(server_id)
             if not cache_info.get('roles'):
                 cache_info['roles'] = [[role_id, role_name]]
             else:
                 cache_info['roles'].append([role_id, role_name])
         for channel_id, server_id in all_channels:
-            cache_info = ex.cache.assignable_roles.get(server_id)
+            cache_info = assignable_roles.get(server_id)
             if cache_info:
                 cache_info['channel_id'] = channel_id
             else:
-                ex.cache.assignable_roles[server_id] = {'channel_id': channel_id}
+                assignable_roles[server_id] = {'channel_id': channel_id}
+        ex.cache.assignable_roles = assignable_roles
 
     @staticmethod
     async def create_weverse_channel_cache():
         """Create cache for channels that are following a community on weverse."""
-        all_channels = await ex.conn.fetch("SELECT channelid, communityname, roleid, commentsdisabled FROM weverse.channels")
+        all_channels = Cache.count_rows(await ex.conn.fetch("SELECT channelid, communityname, roleid, commentsdisabled FROM weverse.channels"))
+        weverse_channels = {}
         for channel_id, community_name, role_id, comments_disabled in all_channels:
-            await ex.u_weverse.add_weverse_channel_to_cache(channel_id, community_name)
-            await ex.u_weverse.add_weverse_role(channel_id, community_name, role_id)
-            await ex.u_weverse.change_weverse_comment_status(channel_id, community_name, comments_disabled)
+            community_name = community_name.lower()
+            channels = weverse_channels.get(community_name)
+            if channels:
+                channels.append([channel_id, role_id, bool(comments_disabled)])
+            else:
+                weverse_channels[community_name] = [[channel_id, role_id, bool(comments_disabled)]]
+        ex.cache.weverse_channels = weverse_channels
 
     async def update_command_counter(self):
         """Updates Cache for command counter and sessions"""
-        ex.cache.command_counter = {}
+        command_counter = {}
         session_id = await self.get_session_id()
-        all_commands = await ex.conn.fetch("SELECT commandname, count FROM stats.commands WHERE sessionid = $1", session_id)
+        all_commands = Cache.count_rows(await ex.conn.fetch("SELECT commandname, count FROM stats.commands WHERE sessionid = $1", session_id))
         for command_name, count in all_commands:
-            ex.cache.command_counter[command_name] = count
-        ex.cache.current_session = ex.first_result(
+            command_counter[command_name] = count
+        current_session = ex.first_result(
             await ex.conn.fetchrow("SELECT session FROM stats.sessions WHERE date = $1", datetime.date.today()))
+        ex.cache.command_counter = command_counter
+        ex.cache.current_session = current_session
 
     @staticmethod
     async def create_restricted_channel_cache():
         """Create restricted idol channel cache"""
-        restricted_channels = await ex.conn.fetch("SELECT channelid, serverid, sendhere FROM groupmembers.restricted")
+        restricted_channels = Cache.count_rows(await ex.conn.fetch("SELECT channelid, serverid, sendhere FROM groupmembers.restricted"))
+        new_restricted_channels = {}
+        send_here_channels = {}
         for channel_id, server_id, send_here in restricted_channels:
-            ex.cache.restricted_channels[channel_id] = [server_id, send_here]
+            new_restricted_channels[channel_id] = [server_id, send_here]
+            if send_here:
+                send_here_channels[server_id] = channel_id
+        ex.cache.restricted_channels = new_restricted_channels
+        ex.cache.send_here_channels = send_here_channels
 
     @staticmethod
     async def create_bot_command_cache():
         """Create custom command cache"""
-        server_commands = await ex.conn.fetch("SELECT serverid, commandname, message FROM general.customcommands")
-        ex.cache.custom_commands = {}
+        server_commands = Cache.count_rows(await ex.conn.fetch("SELECT serverid, commandname, message FROM general.customcommands"))
+        custom_commands = {}
         for server_id, command_name, message in server_commands:
-            cache_info = ex.cache.custom_commands.get(server_id)
+            cache_info = custom_commands.get(server_id)
             if cache_info:
                 cache_info[command_name] = message
             else:
-                ex.cache.custom_commands[server_id] = {command_name: message}
+                custom_commands[server_id] = {command_name: message}
+        ex.cache.custom_commands = custom_commands
 
     @staticmethod
     async def create_bot_status_cache():
-        statuses = await ex.conn.fetch("SELECT status FROM general.botstatus")
+        statuses = Cache.count_rows(await ex.conn.fetch("SELECT status FROM general.botstatus"))
         ex.cache.bot_statuses = [status[0] for status in statuses] or None
 
     @staticmethod
     async def create_dead_link_cache():
         """Creates Dead Link Cache"""
-        ex.cache.dead_image_cache = {}
         try:
             ex.cache.dead_image_channel = await ex.client.fetch_channel(dead_image_channel_id)
         except:
             pass
-        dead_images = await ex.conn.fetch("SELECT deadlink, userid, messageid, idolid, guessinggame FROM groupmembers.deadlinkfromuser")
+        dead_image_cache = {}
+        dead_images = Cache.count_rows(await ex.conn.fetch("SELECT deadlink, userid, messageid, idolid, guessinggame FROM groupmembers.deadlinkfromuser"))
         for dead_link, user_id, message_id, idol_id, guessing_game in dead_images:
-            ex.cache.dead_image_cache[message_id] = [dead_link, user_id, idol_id, guessing_game]
+            dead_image_cache[message_id] = [dead_link, user_id, idol_id, guessing_game]
+        ex.cache.dead_image_cache = dead_image_cache
 
-    @staticmethod
-    async def create_idol_cache():
-        """Create Idol Objects and store them as cache."""
-        ex.cache.idols = []
-        for idol in await ex.u_group_members.get_db_all_members():
+    async def load_idol_to_group(self):
+        """Read every idol to group connection once for both the idol and the group objects."""
+        self.idol_to_group = await ex.u_group_members.get_db_all_idol_to_group()
+
+    async def create_idol_cache(self):
+        """Create Idol Objects and store them as cache.
+
+        Aliases, groups, and call counts are fetched once for every idol and joined in memory.
+        """
+        idols = []
+        all_aliases = await ex.u_group_members.get_db_all_aliases()
+        idol_groups, group_members = self.idol_to_group or await ex.u_group_members.get_db_all_idol_to_group()
+        all_called = await ex.u_group_members.get_db_all_idol_called()
+        for idol in Cache.count_rows(await ex.u_group_members.get_db_all_members()):
             idol_obj = ex.u_group_members.Idol(**idol)
-            idol_obj.aliases, idol_obj.local_aliases = await ex.u_group_members.get_db_aliases(idol_obj.id)
-            # add all group ids and remove potential duplicates
-            idol_obj.groups = list(dict.fromkeys(await ex.u_group_members.get_db_groups_from_member(idol_obj.id)))
-            idol_obj.called = await ex.u_group_members.get_db_idol_called(idol_obj.id)
+            idol_obj.aliases, idol_obj.local_aliases = all_aliases.get(idol_obj.id) or [[], {}]
+            idol_obj.groups = idol_groups.get(idol_obj.id) or []
+            idol_obj.called = all_called.get(idol_obj.id)
             idol_obj.photo_count = ex.cache.idol_photos.get(idol_obj.id) or 0
-            ex.cache.idols.append(idol_obj)
+            idols.append(idol_obj)
+        ex.u_group_members.set_idol_cache(idols)
 
-    @staticmethod
-    async def create_group_cache():
-        """Create Group Objects and store them as cache"""
-        ex.cache.groups = []
-        for group in await ex.u_group_members.get_all_groups():
+    async def create_group_cache(self):
+        """Create Group Objects and store them as cache
+
+        Aliases and members are fetched once for every group and joined in memory.
+        """
+        groups = []
+        all_aliases = await ex.u_group_members.get_db_all_aliases(group=True)
+        idol_groups, group_members = self.idol_to_group or await ex.u_group_members.get_db_all_idol_to_group()
+        for group in Cache.count_rows(await ex.u_group_members.get_all_groups()):
             group_obj = ex.u_group_members.Group(**group)
-            group_obj.aliases, group_obj.local_aliases = await ex.u_group_members.get_db_aliases(group_obj.id, group=True)
-            # add all idol ids and remove potential duplicates
-            group_obj.members = list(dict.fromkeys(await ex.u_group_members.get_db_members_in_group(group_id=group_obj.id)))
+            group_obj.aliases, group_obj.local_aliases = all_aliases.get(group_obj.id) or [[], {}]
+            group_obj.members = group_members.get(group_obj.id) or []
             group_obj.photo_count = ex.cache.group_photos.get(group_obj.id) or 0
-            ex.cache.groups.append(group_obj)
+            groups.append(group_obj)
+        ex.u_group_members.set_group_cache(groups)
 
     async def process_session(self):
         """Sets the new session id, total used, and time format for distinguishing days."""
@@ -197,6 +388,8 @@ class Cache:
             # check that the date is correct, and if not, call get_session_id to get the new session id.
             if current_time_format != ex.cache.session_time_format:
                 ex.cache.current_session = 0
+                # command counts are kept per session.
+                ex.cache.command_counter = {}
                 ex.cache.session_id = None
                 ex.cache.session_id = await self.get_session_id()
 
@@ -208,144 +401,193 @@ class Cache:
     @staticmethod
     async def update_n_word_counter():
         """Update NWord Cache"""
-        ex.cache.n_word_counter = {}
-        user_info = await ex.conn.fetch("SELECT userid, nword FROM general.nword")
-        for user_id, n_word_counter in user_info:
-            ex.cache.n_word_counter[user_id] = n_word_counter
+        n_word_counter = {}
+        user_info = Cache.count_rows(await ex.conn.fetch("SELECT userid, nword FROM general.nword"))
+        for user_id, user_counter in user_info:
+            n_word_counter[user_id] = user_counter
+        ex.cache.n_word_counter = n_word_counter
 
     @staticmethod
     async def update_temp_channels():
         """Create the cache for temp channels."""
-        ex.cache.temp_channels = {}
-        channels = await ex.u_miscellaneous.get_temp_channels()
+        temp_channels = {}
+        channels = Cache.count_rows(await ex.u_miscellaneous.get_temp_channels())
         for channel_id, delay in channels:
             removal_time = delay
             if removal_time < 60:
                 removal_time = 60
-            ex.cache.temp_channels[channel_id] = removal_time
+            temp_channels[channel_id] = removal_time
+        ex.cache.temp_channels = temp_channels
+
+    @staticmethod
+    async def update_archived_channels():
+        """Create the cache for channels that are being archived."""
+        channels = Cache.count_rows(await ex.conn.fetch("SELECT channelid, driveid FROM archive.channellist"))
+        ex.cache.archived_channels = {channel_id: drive_id for channel_id, drive_id in channels}
 
     @staticmethod
     async def update_welcome_message_cache():
         """Create the cache for welcome messages."""
-        ex.cache.welcome_messages = {}
-        info = await ex.conn.fetch("SELECT channelid, serverid, message, enabled FROM general.welcome")
+        welcome_messages = {}
+        info = Cache.count_rows(await ex.conn.fetch("SELECT channelid, serverid, message, enabled FROM general.welcome"))
         for channel_id, server_id, message_id, enabled in info:
-            ex.cache.welcome_messages[server_id] = {"channel_id": channel_id, "message": message_id, "enabled": enabled}
+            welcome_messages[server_id] = {"channel_id": channel_id, "message": message_id, "enabled": enabled}
+        ex.cache.welcome_messages = welcome_messages
 
     @staticmethod
     async def update_server_prefixes():
         """Create the cache for server prefixes."""
-        ex.cache.server_prefixes = {}
-        info = await ex.conn.fetch("SELECT serverid, prefix FROM general.serverprefix")
+        server_prefixes = {}
+        info = Cache.count_rows(await ex.conn.fetch("SELECT serverid, prefix FROM general.serverprefix"))
         for server_id, prefix in info:
-            ex.cache.server_prefixes[server_id] = prefix
+            server_prefixes[server_id] = prefix
+        ex.cache.server_prefixes = server_prefixes
 
     @staticmethod
     async def update_logging_channels():
         """Create the cache for logged servers and channels."""
-        ex.cache.logged_channels = {}
-        ex.cache.list_of_logged_channels = []
-        logged_servers = await ex.conn.fetch("SELECT id, serverid, channelid, sendall FROM logging.servers WHERE status = $1", 1)
-        for p_id, server_id, channel_id, send_all in logged_servers:
-            channels = await ex.conn.fetch("SELECT channelid FROM logging.channels WHERE server = $1", p_id)
-            for channel in channels:
-                ex.cache.list_of_logged_channels.append(channel[0])
-            ex.cache.logged_channels[server_id] = {
-                "send_all": send_all,
-                "logging_channel": channel_id,
-                "channels": [channel[0] for channel in channels]
-            }
+        logged_channels = {}
+        logged_channel_ids = set()
+        logged_servers = Cache.count_rows(await ex.conn.fetch(
+            "SELECT s.serverid, s.channelid, s.sendall, c.channelid FROM logging.servers s LEFT JOIN logging.channels c "
+            "ON c.server = s.id WHERE s.status = $1", 1))
+        for server_id, channel_id, send_all, logged_channel_id in logged_servers:
+            server = logged_channels.get(server_id)
+            if not server:
+                server = {
+                    "send_all": send_all,
+                    "logging_channel": channel_id,
+                    "channels": []
+                }
+                logged_channels[server_id] = server
+            # servers without any logged channels have a single row with no channel.
+            if logged_channel_id:
+                server['channels'].append(logged_channel_id)
+                logged_channel_ids.add(logged_channel_id)
+        ex.cache.logged_channels = logged_channels
+        ex.cache.logged_channel_ids = logged_channel_ids
 
     @staticmethod
     async def update_bot_bans():
         """Create the cache for banned users from the bot."""
-        ex.cache.bot_banned = []
-        banned_users = await ex.conn.fetch("SELECT userid FROM general.blacklisted")
+        bot_banned = []
+        banned_users = Cache.count_rows(await ex.conn.fetch("SELECT userid FROM general.blacklisted"))
         for user in banned_users:
             user_id = user[0]
-            ex.cache.bot_banned.append(user_id)
+            bot_banned.append(user_id)
+        ex.cache.bot_banned = bot_banned
 
     @staticmethod
     async def update_mod_mail():
         """Create the cache for existing mod mail"""
-        ex.cache.mod_mail = {}
-        mod_mail = await ex.conn.fetch("SELECT userid, channelid FROM general.modmail")
-        for user_id, channel_id in mod_mail:
-            ex.cache.mod_mail[user_id] = [channel_id]
+        mod_mail = {}
+        mod_mail_channels = {}
+        for user_id, channel_id in Cache.count_rows(await ex.conn.fetch("SELECT userid, channelid FROM general.modmail")):
+            mod_mail[user_id] = channel_id
+            mod_mail_channels[channel_id] = user_id
+        ex.cache.mod_mail = mod_mail
+        ex.cache.mod_mail_channels = mod_mail_channels
 
     @staticmethod
     async def update_patreons():
-        """Create the cache for Patrons."""
+        """Create the cache for Patrons.
+
+        The patrons in the support server roles are compared against the db cache as sets, and the
+        differences are written with one statement each inside a single transaction.
+        """
         try:
-            ex.cache.patrons = {}
+            patrons = {}
             permanent_patrons = await ex.u_patreon.get_patreon_users()
             # normal patrons contains super patrons as well
-            normal_patrons = [patron.id for patron in await ex.u_patreon.get_patreon_role_members(super_patron=False)]
-            super_patrons = [patron.id for patron in await ex.u_patreon.get_patreon_role_members(super_patron=True)]
+            normal_patrons = {patron.id for patron in await ex.u_patreon.get_patreon_role_members(super_patron=False)}
+            super_patrons = {patron.id for patron in await ex.u_patreon.get_patreon_role_members(super_patron=True)}
 
             # the reason for db cache is because of the new discord rate limit
             # where it now takes 20+ minutes for discord cache to fully load, meaning we can only
             # access the roles after 20 minutes on boot.
             # this is an alternative to get patreons instantly and later modifying the cache after the cache loads.
-            # remove any patrons from db set cache that should not exist or should be modified.
-            cached_patrons = await ex.conn.fetch("SELECT userid, super FROM patreon.cache")
-            for user_id, super_patron in cached_patrons:
-                if user_id not in normal_patrons:
-                    # they are not a patron at all, so remove them from db cache
-                    await ex.conn.execute("DELETE FROM patreon.cache WHERE userid = $1", user_id)
-                elif user_id in super_patrons and not super_patron:
-                    # if they are a super patron but their db is cache is a normal patron
-                    await ex.conn.execute("UPDATE patreon.cache SET super = $1 WHERE userid = $2", 1, user_id)
-                elif user_id not in super_patrons and super_patron:
-                    # if they are not a super patron, but the db cache says they are.
-                    await ex.conn.execute("UPDATE patreon.cache SET super = $1 WHERE userid = $2", 0, user_id)
-            cached_patrons = [patron[0] for patron in cached_patrons]  # list of user ids removing patron status.
-
-            # fix db cache and live Irene cache
+            cached_patrons = {user_id: bool(super_patron) for user_id, super_patron in
+                              Cache.count_rows(await ex.conn.fetch("SELECT userid, super FROM patreon.cache"))}
+            cached_ids = set(cached_patrons)
+
+            # they are not a patron at all, so remove them from db cache
+            removed_patrons = cached_ids - normal_patrons
+            # patron includes both normal and super patrons.
+            added_patrons = normal_patrons - cached_ids
+            # existing patrons whose tier in the db cache no longer matches their roles.
+            kept_patrons = cached_ids & normal_patrons
+            promoted_patrons = {user_id for user_id in kept_patrons
+                                if user_id in super_patrons and not cached_patrons[user_id]}
+            demoted_patrons = {user_id for user_id in kept_patrons
+                               if user_id not in super_patrons and cached_patrons[user_id]}
+
+            if removed_patrons or added_patrons or promoted_patrons or demoted_patrons:
+                async with ex.conn.acquire() as conn:
+                    async with conn.transaction():
+                        if removed_patrons:
+                            await conn.execute("DELETE FROM patreon.cache WHERE userid = ANY($1::bigint[])",
+                                               list(removed_patrons))
+                        if added_patrons:
+                            await conn.executemany("INSERT INTO patreon.cache(userid, super) VALUES($1, $2)",
+                                                   [(user_id, int(user_id in super_patrons))
+                                                    for user_id in added_patrons])
+                        if promoted_patrons:
+                            await conn.execute("UPDATE patreon.cache SET super = 1 WHERE userid = ANY($1::bigint[])",
+                                               list(promoted_patrons))
+                        if demoted_patrons:
+                            await conn.execute("UPDATE patreon.cache SET super = 0 WHERE userid = ANY($1::bigint[])",
+                                               list(demoted_patrons))
+
+            # fix live Irene cache
             for patron in normal_patrons:
-                if patron not in cached_patrons:
-                    # patron includes both normal and super patrons.
-                    await ex.conn.execute("INSERT INTO patreon.cache(userid, super) VALUES($1, $2)", patron, 0)
-                ex.cache.patrons[patron] = False
-            # super patrons must go after normal patrons to have a proper boolean set because
-            # super patrons have both roles.
+                patrons[patron] = patron in super_patrons
+            # super patrons without the normal role are still super patrons.
             for patron in super_patrons:
-                if patron not in cached_patrons:
-                    await ex.conn.execute("UPDATE patreon.cache SET super = $1 WHERE userid = $2", 1, patron)
-                ex.cache.patrons[patron] = True
+                patrons[patron] = True
             for patron in permanent_patrons:
-                ex.cache.patrons[patron[0]] = True
+                patrons[patron[0]] = True
+            ex.cache.patrons = patrons
             return True
-        except:
+        except Exception as e:
+            log.console(f"{e} - Cache.update_patreons")
             return False
 
     @staticmethod
     async def update_user_notifications():
         """Set the cache for user phrases"""
-        ex.cache.user_notifications = []
-        notifications = await ex.conn.fetch("SELECT guildid,userid,phrase FROM general.notifications")
+        user_notifications = {}
+        notifications = Cache.count_rows(await ex.conn.fetch("SELECT guildid,userid,phrase FROM general.notifications"))
         for guild_id, user_id, phrase in notifications:
-            ex.cache.user_notifications.append([guild_id, user_id, phrase])
+            user_notifications.setdefault(guild_id, {}).setdefault(phrase, set()).add(user_id)
+        ex.cache.user_notifications = user_notifications
 
     @staticmethod
     async def update_groups():
         """Set cache for group photo count"""
-        ex.cache.group_photos = {}
-        all_group_counts = await ex.conn.fetch("SELECT g.groupid, g.groupname, COUNT(f.link) FROM groupmembers.groups g, groupmembers.member m, groupmembers.idoltogroup l, groupmembers.imagelinks f WHERE m.id = l.idolid AND g.groupid = l.groupid AND f.memberid = m.id GROUP BY g.groupid ORDER BY g.groupname")
+        group_photos = {}
+        all_group_counts = Cache.count_rows(await ex.conn.fetch("SELECT g.groupid, g.groupname, COUNT(f.link) FROM groupmembers.groups g, groupmembers.member m, groupmembers.idoltogroup l, groupmembers.imagelinks f WHERE m.id = l.idolid AND g.groupid = l.groupid AND f.memberid = m.id GROUP BY g.groupid ORDER BY g.groupname"))
         for group in all_group_counts:
-            ex.cache.group_photos[group[0]] = group[2]
+            group_photos[group[0]] = group[2]
+        ex.cache.group_photos = group_photos
 
     @staticmethod
     async def update_idols():
         """Set cache for idol photo count"""
-        ex.cache.idol_photos = {}
-        all_idol_counts = await ex.conn.fetch("SELECT memberid, COUNT(link) FROM groupmembers.imagelinks GROUP BY memberid")
+        idol_photos = {}
+        all_idol_counts = Cache.count_rows(await ex.conn.fetch("SELECT memberid, COUNT(link) FROM groupmembers.imagelinks GROUP BY memberid"))
         for idol_id, count in all_idol_counts:
-            ex.cache.idol_photos[idol_id] = count
+            idol_photos[idol_id] = count
+        ex.cache.idol_photos = idol_photos
 
     @tasks.loop(seconds=0, minutes=0, hours=12, reconnect=True)
     async def update_cache(self):
-        """Looped every 12 hours to update the cache in case of anything faulty."""
+        """Looped every 12 hours to update the cache in case of anything faulty.
+
+        Every loader builds its new cache separately and swaps it in with a single assignment,
+        so nothing reading the cache will see it empty or partially loaded while it refreshes.
+        The change feed does not watch every table the cache is built from (photo counts, dead links, reminders,
+        ...), so the cache is still rebuilt while it is listening.
+        """
         while not ex.conn:
             await asyncio.sleep(1)
         await self.create_cache()
@@ -358,23 +600,27 @@ class Cache:
         # create a temporary patron list based on the db cache while waiting for the discord cache to load
         if ex.conn:
             if not ex.temp_patrons_loaded:
-                ex.cache.patrons = {}
+                patrons = {}
                 cached_patrons = await ex.conn.fetch("SELECT userid, super FROM patreon.cache")
                 for user_id, super_patron in cached_patrons:
-                    ex.cache.patrons[user_id] = bool(super_patron)
+                    patrons[user_id] = bool(super_patron)
+                ex.cache.patrons = patrons
                 ex.temp_patrons_loaded = True
             while not ex.discord_cache_loaded:
                 await asyncio.sleep(1)
-            if await self.process_cache_time(self.update_patreons, "Patrons"):
-                self.update_patron_cache_hour.start()
+            if await self.process_cache_time(self.update_patreons, "Patrons", ['patrons']):
+                self.reconcile_patron_cache.start()
                 self.update_patron_cache.stop()
 
-    @tasks.loop(seconds=0, minutes=0, hours=1, reconnect=True)
-    async def update_patron_cache_hour(self):
-        """Update Patron Cache every hour in the case of unaccounted errors."""
+    @tasks.loop(seconds=0, minutes=0, hours=12, reconnect=True)
+    async def reconcile_patron_cache(self):
+        """Fully reconcile the Patron Cache every 12 hours in the case of unaccounted errors.
+
+        Role changes are applied as they happen by on_member_update, so this is only a safety net.
+        """
         # this is to make sure on the first run it doesn't update since it is created elsewhere.
         if ex.loop_count:
-            await self.process_cache_time(self.update_patreons, "Patrons")
+            await self.process_cache_time(self.update_patreons, "Patrons", ['patrons'])
         ex.loop_count += 1
 
     @tasks.loop(seconds=0, minutes=1, hours=0, reconnect=True)
@@ -394,7 +640,8 @@ class Cache:
                     'patrons': len(ex.cache.patrons),
                     'custom_server_prefixes': len(ex.cache.server_prefixes),
                     'session_commands_used': ex.cache.current_session,
-                    'user_notifications': len(ex.cache.user_notifications),
+                    'user_notifications': sum(len(user_ids) for phrases in ex.cache.user_notifications.values()
+                                              for user_ids in phrases.values()),
                     'mod_mail': len(ex.cache.mod_mail),
                     'banned_from_bot': len(ex.cache.bot_banned),
                     'logged_servers': len(ex.cache.logged_channels),
@@ -417,8 +664,26 @@ class Cache:
                     'errors_per_minute': ex.cache.errors_per_minute,
                     'wolfram_per_minute': ex.cache.wolfram_per_minute,
                     'urban_per_minute': ex.cache.urban_per_minute,
+                    'photo_pool_hits_per_minute': ex.cache.photo_pool_hits_per_minute,
+                    'photo_pool_misses_per_minute': ex.cache.photo_pool_misses_per_minute,
                     'active_user_reminders': active_user_reminders
                 }
+                # statistics of every cache loader from its last successful build.
+                for loader_name, stats in self.loader_stats.items():
+                    metric_prefix = f"cache_{loader_name.lower().replace(' ', '_').replace('-', '_')}"
+                    metric_info[f"{metric_prefix}_load_time"] = stats.get("duration")
+                    metric_info[f"{metric_prefix}_rows_fetched"] = stats.get("rows")
+                    metric_info[f"{metric_prefix}_entries"] = stats.get("entries")
+                    metric_info[f"{metric_prefix}_memory"] = stats.get("memory")
+
+                # responses from the API by status code and the state of its circuit breakers.
+                metric_info.update(ex.u_api.get_metrics())
+
+                # reactions that are being waited on and the waits that expired.
+                metric_info.update(ex.u_reactions.get_metrics())
+
+                # calls and average time of every message handler.
+                metric_info.update(ex.u_message_router.get_metrics())
 
                 # set all per minute metrics to 0 since this is a 60 second loop.
                 ex.cache.n_words_per_minute = 0
@@ -429,6 +694,8 @@ class Cache:
                 ex.cache.errors_per_minute = 0
                 ex.cache.wolfram_per_minute = 0
                 ex.cache.urban_per_minute = 0
+                ex.cache.photo_pool_hits_per_minute = 0
+                ex.cache.photo_pool_misses_per_minute = 0
                 for metric_name in metric_info:
                     try:
                         metric_value = metric_info.get(metric_name)
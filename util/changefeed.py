@@ -0,0 +1,376 @@
+from Utility import resources as ex
+from discord.ext import tasks
+from module import logger as log
+import asyncio
+import json
+
+
+# noinspection PyBroadException,PyPep8
+class ChangeFeed:
+    """Keeps the cache in sync with changes made to the database outside of Irene (API, website, manual edits).
+
+    Every watched table has a trigger that sends a notification on the irene_cache channel with the payload
+    {"table": "schema.table", "op": "INSERT"/"UPDATE"/"DELETE", "row": {new row}, "old": {old row}}
+    Irene's own edits are also received, so every handler must be safe to apply more than once.
+    """
+    notify_channel = "irene_cache"
+    trigger_name = "irene_cache_change"
+
+    def __init__(self):
+        self.connection = None  # connection held from the pool that is listening for notifications.
+        self.listening = False
+        self.queue = asyncio.Queue()  # notifications are applied in the order they were committed.
+        self.worker = None
+        self.pending_reloads = {}  # { loader_name: task } for tables that reload a whole cache.
+        # notifications wait while the cache is being built, so they are applied after the new cache is swapped in.
+        self.cache_builds = 0
+        self.applying = asyncio.Event()
+        self.applying.set()
+        """
+        {
+        table_name: [key columns sent instead of the full row or None, handler]
+        }
+        A notification can not be larger than 8000 bytes, so tables with long free text only send their keys
+        and the row is fetched again.
+        """
+        self.tables = {
+            "general.serverprefix": [None, self.update_server_prefix],
+            "general.customcommands": [["serverid", "commandname"], self.update_custom_command],
+            "general.welcome": [["serverid"], self.update_welcome_message],
+            "general.blacklisted": [None, self.update_bot_ban],
+            "general.modmail": [None, self.update_mod_mail],
+            "general.notifications": [None, self.update_user_notification],
+            "general.tempchannels": [None, self.update_temp_channel],
+            "archive.channellist": [None, self.update_archived_channel],
+            "groupmembers.restricted": [None, self.update_restricted_channel],
+            "groupmembers.aliases": [None, self.update_alias],
+            "groupmembers.idoltogroup": [None, self.update_idol_to_group],
+            # idol and group rows can be larger than the notification payload limit, so only their ids are sent.
+            "groupmembers.member": [["id"], self.update_idol],
+            "groupmembers.groups": [["groupid"], self.update_group],
+            # these caches are small and nested, so the whole cache is reloaded instead.
+            "logging.servers": [None, self.reload_logging_channels],
+            "logging.channels": [None, self.reload_logging_channels],
+            "selfassignroles.roles": [None, self.reload_self_assignable_roles],
+            "selfassignroles.channels": [None, self.reload_self_assignable_roles],
+            "weverse.channels": [None, self.reload_weverse_channels],
+        }
+
+    async def create_triggers(self):
+        """Create the notification function and the triggers on every watched table if they do not exist."""
+        await ex.conn.execute(f"""
+            CREATE OR REPLACE FUNCTION general.notify_cache_change() RETURNS trigger AS $$
+            DECLARE
+                new_row jsonb := CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE to_jsonb(NEW) END;
+                old_row jsonb := CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE to_jsonb(OLD) END;
+            BEGIN
+                IF TG_NARGS > 0 AND new_row IS NOT NULL THEN
+                    SELECT jsonb_object_agg(key, value) INTO new_row FROM jsonb_each(new_row) WHERE key = ANY(TG_ARGV);
+                END IF;
+                IF TG_NARGS > 0 AND old_row IS NOT NULL THEN
+                    SELECT jsonb_object_agg(key, value) INTO old_row FROM jsonb_each(old_row) WHERE key = ANY(TG_ARGV);
+                END IF;
+                PERFORM pg_notify('{self.notify_channel}', jsonb_build_object(
+                    'table', TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME, 'op', TG_OP, 'row', new_row, 'old', old_row
+                )::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql""")
+        existing_triggers = await ex.conn.fetch("""SELECT n.nspname || '.' || c.relname, pg_get_triggerdef(t.oid)
+            FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE t.tgname = $1""", self.trigger_name)
+        existing_triggers = {table_name: definition for table_name, definition in existing_triggers}
+        for table_name, (key_columns, handler) in self.tables.items():
+            arguments = ", ".join(f"'{column}'" for column in key_columns or [])
+            definition = existing_triggers.get(table_name)
+            if definition:
+                if definition.endswith(f"notify_cache_change({arguments})"):
+                    continue
+                # the trigger sends different columns than it should, so it is created again.
+                await ex.conn.execute(f"DROP TRIGGER {self.trigger_name} ON {table_name}")
+            await ex.conn.execute(f"""CREATE TRIGGER {self.trigger_name} AFTER INSERT OR UPDATE OR DELETE
+                ON {table_name} FOR EACH ROW EXECUTE PROCEDURE general.notify_cache_change({arguments})""")
+
+    async def start(self):
+        """Hold a connection from the pool and start listening for changes."""
+        try:
+            await self.create_triggers()
+        except Exception as e:
+            # the triggers may have been created by a user with more privileges.
+            log.console(f"{e} - ChangeFeed.create_triggers")
+        self.connection = await ex.conn.acquire()
+        await self.connection.add_listener(self.notify_channel, self.on_notification)
+        if not self.worker or self.worker.done():
+            self.worker = asyncio.create_task(self.process_queue())
+        self.listening = True
+        log.console("Listening for database changes.")
+
+    async def stop(self):
+        """Stop listening and give the connection back to the pool."""
+        self.listening = False
+        if self.connection:
+            try:
+                await self.connection.remove_listener(self.notify_channel, self.on_notification)
+            except:
+                pass
+            try:
+                await ex.conn.release(self.connection)
+            except:
+                pass
+            self.connection = None
+
+    def pause(self):
+        """Hold notifications in the queue while the cache is being built from the database."""
+        self.cache_builds += 1
+        self.applying.clear()
+
+    def resume(self):
+        """Apply the held notifications once every cache build has finished.
+        Every handler is safe to apply more than once, so changes the build already read are applied again."""
+        self.cache_builds = max(self.cache_builds - 1, 0)
+        if not self.cache_builds:
+            self.applying.set()
+
+    def on_notification(self, connection, pid, channel, payload):
+        """Called by asyncpg for every notification received."""
+        self.queue.put_nowait(payload)
+
+    async def process_queue(self):
+        """Apply notifications one at a time so they are applied in the order they were committed."""
+        while True:
+            payload = await self.queue.get()
+            await self.applying.wait()
+            try:
+                change = json.loads(payload)
+                table = self.tables.get(change.get('table'))
+                if table:
+                    await table[1](change.get('op'), change.get('row') or {}, change.get('old') or {})
+            except Exception as e:
+                log.console(f"{e} - ChangeFeed.process_queue")
+
+    @tasks.loop(seconds=0, minutes=1, hours=0, reconnect=True)
+    async def check_change_feed(self):
+        """Looped every minute to start listening and to listen again if the connection was lost.
+        Changes may have been missed while the connection was down, so the cache is rebuilt afterwards."""
+        if not ex.conn:
+            return
+        if self.listening and self.connection and not self.connection.is_closed():
+            return
+        was_listening = self.listening
+        await self.stop()
+        try:
+            await self.start()
+        except Exception as e:
+            log.console(f"{e} - ChangeFeed.check_change_feed")
+            return
+        if was_listening:
+            await ex.u_cache.create_cache()
+
+    async def reload_cache(self, loader_name):
+        """Reload an entire cache after a short delay so a burst of changes only reloads it once."""
+        async def reload():
+            await asyncio.sleep(1)
+            self.pending_reloads.pop(loader_name, None)
+            method = ex.u_cache.get_cache_loaders().get(loader_name)[0]
+            self.pause()
+            try:
+                await ex.u_cache.process_cache_time(method, loader_name)
+            finally:
+                self.resume()
+
+        if not self.pending_reloads.get(loader_name):
+            self.pending_reloads[loader_name] = asyncio.create_task(reload())
+
+    async def reload_logging_channels(self, op, row, old):
+        await self.reload_cache("Logged Channels")
+
+    async def reload_self_assignable_roles(self, op, row, old):
+        await self.reload_cache("Self-Assignable Roles")
+
+    async def reload_weverse_channels(self, op, row, old):
+        await self.reload_cache("Weverse Text Channels")
+
+    @staticmethod
+    async def update_server_prefix(op, row, old):
+        if op == "DELETE":
+            ex.cache.server_prefixes.pop(old.get('serverid'), None)
+        else:
+            ex.cache.server_prefixes[row.get('serverid')] = row.get('prefix')
+
+    @staticmethod
+    async def update_custom_command(op, row, old):
+        """Only the keys are sent, so the message is fetched again."""
+        if op != "INSERT":
+            custom_commands = ex.cache.custom_commands.get(old.get('serverid'))
+            if custom_commands:
+                custom_commands.pop(old.get('commandname'), None)
+            ex.u_custom_commands.invalidate_pages(old.get('serverid'))
+        if op != "DELETE":
+            message = await ex.conn.fetchval("SELECT message FROM general.customcommands WHERE serverid = $1 AND "
+                                             "commandname = $2", row.get('serverid'), row.get('commandname'))
+            if message is None:
+                # removed again before the notification was applied.
+                return
+            custom_commands = ex.cache.custom_commands.get(row.get('serverid'))
+            if custom_commands:
+                custom_commands[row.get('commandname')] = message
+            else:
+                ex.cache.custom_commands[row.get('serverid')] = {row.get('commandname'): message}
+            ex.u_custom_commands.invalidate_pages(row.get('serverid'))
+
+    @staticmethod
+    async def update_welcome_message(op, row, old):
+        """Only the server id is sent, so the welcome message is fetched again."""
+        if op != "INSERT":
+            ex.cache.welcome_messages.pop(old.get('serverid'), None)
+        if op != "DELETE":
+            welcome = await ex.conn.fetchrow("SELECT channelid, message, enabled FROM general.welcome WHERE "
+                                             "serverid = $1", row.get('serverid'))
+            if welcome:
+                channel_id, message, enabled = welcome
+                ex.cache.welcome_messages[row.get('serverid')] = {"channel_id": channel_id, "message": message,
+                                                                  "enabled": enabled}
+
+    @staticmethod
+    async def update_bot_ban(op, row, old):
+        if op != "INSERT" and old.get('userid') in ex.cache.bot_banned:
+            ex.cache.bot_banned.remove(old.get('userid'))
+        if op != "DELETE" and row.get('userid') not in ex.cache.bot_banned:
+            ex.cache.bot_banned.append(row.get('userid'))
+
+    @staticmethod
+    async def update_mod_mail(op, row, old):
+        if op != "INSERT":
+            await ex.u_miscellaneous.remove_mod_mail_from_cache(old.get('userid'))
+        if op != "DELETE":
+            await ex.u_miscellaneous.add_mod_mail_to_cache(row.get('userid'), row.get('channelid'))
+
+    @staticmethod
+    async def update_user_notification(op, row, old):
+        if op != "INSERT":
+            await ex.u_miscellaneous.remove_user_notification_from_cache(old.get('guildid'), old.get('userid'),
+                                                                         old.get('phrase'))
+        if op != "DELETE":
+            await ex.u_miscellaneous.add_user_notification_to_cache(row.get('guildid'), row.get('userid'),
+                                                                    row.get('phrase'))
+
+    @staticmethod
+    async def update_temp_channel(op, row, old):
+        if op != "INSERT":
+            ex.cache.temp_channels.pop(old.get('chanid'), None)
+        if op != "DELETE":
+            # the minimum delay is a minute, matching the cache loader.
+            ex.cache.temp_channels[row.get('chanid')] = max(row.get('delay'), 60)
+
+    @staticmethod
+    async def update_archived_channel(op, row, old):
+        if op != "INSERT":
+            ex.cache.archived_channels.pop(old.get('channelid'), None)
+        if op != "DELETE":
+            ex.cache.archived_channels[row.get('channelid')] = row.get('driveid')
+
+    @staticmethod
+    async def update_restricted_channel(op, row, old):
+        if op != "INSERT":
+            await ex.u_group_members.delete_restricted_channel_from_cache(old.get('channelid'), old.get('sendhere'))
+        if op != "DELETE":
+            await ex.u_group_members.add_restricted_channel_to_cache(row.get('channelid'), row.get('serverid'),
+                                                                     row.get('sendhere'))
+
+    @staticmethod
+    async def get_alias_object(object_id, is_group):
+        if is_group:
+            return await ex.u_group_members.get_group(object_id)
+        return await ex.u_group_members.get_member(object_id)
+
+    async def update_alias(self, op, row, old):
+        if op != "INSERT":
+            obj = await self.get_alias_object(old.get('objectid'), old.get('isgroup'))
+            if obj:
+                alias, server_id = old.get('alias'), old.get('serverid')
+                aliases = obj.local_aliases.get(server_id) if server_id else obj.aliases
+                if aliases and alias in aliases:
+                    aliases.remove(alias)
+                    ex.u_group_members.remove_from_name_index(obj, alias, server_id)
+        if op != "DELETE":
+            obj = await self.get_alias_object(row.get('objectid'), row.get('isgroup'))
+            if obj:
+                alias, server_id = row.get('alias'), row.get('serverid')
+                aliases = obj.local_aliases.get(server_id) if server_id else obj.aliases
+                if aliases is None:
+                    aliases = obj.local_aliases[server_id] = []
+                if alias not in aliases:
+                    aliases.append(alias)
+                    ex.u_group_members.add_to_name_index(obj, alias, server_id)
+
+    @staticmethod
+    async def update_idol_to_group(op, row, old):
+        if op != "INSERT":
+            idol = await ex.u_group_members.get_member(old.get('idolid'))
+            group = await ex.u_group_members.get_group(old.get('groupid'))
+            if idol and old.get('groupid') in idol.groups:
+                idol.groups.remove(old.get('groupid'))
+            if group and old.get('idolid') in group.members:
+                group.members.remove(old.get('idolid'))
+        if op != "DELETE":
+            idol = await ex.u_group_members.get_member(row.get('idolid'))
+            group = await ex.u_group_members.get_group(row.get('groupid'))
+            if idol and row.get('groupid') not in idol.groups:
+                idol.groups.append(row.get('groupid'))
+            if group and row.get('idolid') not in group.members:
+                group.members.append(row.get('idolid'))
+        ex.u_group_members.update_idol_pools()
+        ex.u_group_members.invalidate_rendered_embeds()
+
+    @staticmethod
+    async def update_idol(op, row, old):
+        """Fetch the changed idol and replace it in the cache, keeping the information that is loaded separately."""
+        idol_id = (old if op == "DELETE" else row).get('id')
+        old_idol = await ex.u_group_members.get_member(idol_id)
+        idols = [idol for idol in ex.cache.idols if idol.id != idol_id]
+        record = await ex.u_group_members.get_db_member(idol_id) if op != "DELETE" else None
+        if record:
+            idol_obj = ex.u_group_members.Idol(**record)
+            if old_idol:
+                idol_obj.aliases, idol_obj.local_aliases = old_idol.aliases, old_idol.local_aliases
+                idol_obj.groups, idol_obj.called = old_idol.groups, old_idol.called
+            else:
+                idol_obj.aliases, idol_obj.local_aliases = await ex.u_group_members.get_db_aliases(idol_id)
+                idol_obj.groups = list(dict.fromkeys(await ex.u_group_members.get_db_groups_from_member(idol_id)))
+                idol_obj.called = await ex.u_group_members.get_db_idol_called(idol_id)
+            idol_obj.photo_count = ex.cache.idol_photos.get(idol_id) or 0
+            idols.append(idol_obj)
+            idols.sort(key=lambda idol: idol.id)
+        # copied and swapped so the list is never changed while it is being iterated elsewhere.
+        ex.u_group_members.set_idol_cache(idols)
+
+    @staticmethod
+    async def update_group(op, row, old):
+        """Fetch the changed group and replace it in the cache, keeping the information that is loaded separately."""
+        group_id = (old if op == "DELETE" else row).get('groupid')
+        old_group = await ex.u_group_members.get_group(group_id)
+        groups = list(ex.cache.groups)
+        record = await ex.u_group_members.get_db_group(group_id) if op != "DELETE" else None
+        group_obj = None
+        if record:
+            group_obj = ex.u_group_members.Group(**record)
+            if old_group:
+                group_obj.aliases, group_obj.local_aliases = old_group.aliases, old_group.local_aliases
+                group_obj.members = old_group.members
+            else:
+                group_obj.aliases, group_obj.local_aliases = await ex.u_group_members.get_db_aliases(group_id,
+                                                                                                    group=True)
+                group_obj.members = list(dict.fromkeys(
+                    await ex.u_group_members.get_db_members_in_group(group_id=group_id)))
+            group_obj.photo_count = ex.cache.group_photos.get(group_id) or 0
+        if old_group:
+            # keep the group in the same position since groups are sorted by name.
+            position = groups.index(old_group)
+            if group_obj:
+                groups[position] = group_obj
+            else:
+                groups.pop(position)
+        elif group_obj:
+            groups.append(group_obj)
+        # copied and swapped so the list is never changed while it is being iterated elsewhere.
+        ex.u_group_members.set_group_cache(groups)
@@ -4,6 +4,34 @@ from module import logger as log
 
 # noinspection PyPep8
 class CustomCommands:
+    def __init__(self):
+        # descriptions of the pages of listcommands { server_id: [description] }
+        self.page_cache = {}
+
+    def invalidate_pages(self, server_id):
+        """Discard the listcommands pages of a server after its commands changed."""
+        self.page_cache.pop(server_id, None)
+
+    def get_command_pages(self, server_id):
+        """Get the descriptions of the listcommands pages of a server. Cached until its commands change."""
+        pages = self.page_cache.get(server_id)
+        if pages is None:
+            pages = []
+            page = ""
+            for command_name, message in (ex.cache.custom_commands.get(server_id) or {}).items():
+                line = f"**{command_name}** -> {message}\n"
+                if len(line) > 1000:
+                    pages.append(line)
+                    continue
+                page += line
+                if len(page) >= 950:
+                    pages.append(page)
+                    page = ""
+            if page:
+                pages.append(page)
+            self.page_cache[server_id] = pages
+        return pages
+
     @staticmethod
     async def check_custom_command_name_exists(server_id, command_name):
         if server_id:
@@ -13,23 +41,23 @@ class CustomCommands:
                     return True
         return False
 
-    @staticmethod
-    async def add_custom_command(server_id, command_name, message):
+    async def add_custom_command(self, server_id, command_name, message):
         await ex.conn.execute("INSERT INTO general.customcommands(serverid, commandname, message) VALUES ($1, $2, $3)", server_id, command_name, message)
         custom_commands = ex.cache.custom_commands.get(server_id)
         if custom_commands:
             custom_commands[command_name] = message
         else:
             ex.cache.custom_commands[server_id] = {command_name: message}
+        self.invalidate_pages(server_id)
 
-    @staticmethod
-    async def remove_custom_command(server_id, command_name):
+    async def remove_custom_command(self, server_id, command_name):
         await ex.conn.execute("DELETE FROM general.customcommands WHERE serverid = $1 AND commandname = $2", server_id, command_name)
         custom_commands = ex.cache.custom_commands.get(server_id)
         try:
             custom_commands.pop(command_name)
         except Exception as e:
             log.console(e)
+        self.invalidate_pages(server_id)
 
     @staticmethod
     async def get_custom_command(server_id, command_name):
@@ -15,7 +15,8 @@ class DataDog:
         # some values at 0 are important such as active games, this was put in place to make sure they are updated at 0.
         metrics_at_zero = ['bias_games', 'guessing_games', 'commands_per_minute', 'n_words_per_minute',
                            'bot_api_idol_calls', 'bot_api_translation_calls', 'messages_received_per_min',
-                           'errors_per_minute', 'wolfram_per_minute', 'urban_per_minute']
+                           'errors_per_minute', 'wolfram_per_minute', 'urban_per_minute', 'photo_pool_hits_per_minute',
+                           'photo_pool_misses_per_minute']
         if metric_name in metrics_at_zero and not value:
             value = 0
         else:
@@ -2,16 +2,59 @@ from Utility import resources as ex
 import datetime
 import discord
 from module import logger as log
+from util.namematcher import NameMatcher
+from util.pagination import LazyEmbedList
 import asyncio
+import copy
 import json
 import os
 import random
+import sys
 from module.keys import reload_emoji, dead_emoji, owner_id, mods_list, check_emoji,\
-    trash_emoji, next_emoji, translate_private_key, api_port
+    trash_emoji, next_emoji
+
+
+def intern_string(value):
+    """Intern a string that is repeated across many idols/groups (countries, genders, zodiac signs)
+    so every object shares one copy of it."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def split_tags(tags):
+    """Split a comma separated string of tags into a tuple of interned tags."""
+    if tags:
+        return tuple(intern_string(tag) for tag in tags.split(','))
+    return tags
 
 
 # noinspection PyBroadException,PyPep8
 class GroupMembers:
+    def __init__(self):
+        # increases every time idols, groups, aliases, or group members change so old renders are not used.
+        self.cache_generation = 0
+        """
+        Rendered idol/group cards
+        {
+        (object_id, is_group, server_id, cache_generation): [embed as a dict, description before the called count,
+                                                             description after the called count]
+        }
+        server_id is None unless the server has its own aliases for the object.
+        """
+        self.card_cache = {}
+        # embeds of idol posts without the photo { (idol_id, group_id, cache_generation): embed as a dict }
+        self.post_templates = {}
+        # contents of the pages of idol/alias lists { (list_type, mode, is_mod or server_id, cache_generation): pages }
+        self.page_cache = {}
+
+    def invalidate_rendered_embeds(self):
+        """Discard the rendered cards and post templates after idols, groups, or their aliases changed."""
+        self.cache_generation += 1
+        self.card_cache = {}
+        self.post_templates = {}
+        self.page_cache = {}
+
     @staticmethod
     async def get_if_user_voted(user_id):
         time_stamp = ex.first_result(
@@ -36,9 +79,128 @@ class GroupMembers:
                        f"`{server_prefix}vote` or `{server_prefix}patreon`!**"
         return await message.channel.send(vote_message)
 
+    def get_object_names(self, obj):
+        """Get the lowercase names of an idol/group that are matched exactly (aliases excluded)."""
+        if self.check_idol_object(obj):
+            if obj.full_name and obj.stage_name:
+                return [obj.full_name.lower(), obj.stage_name.lower()]
+            return []
+        return [obj.name.lower()] if obj.name else []
+
+    def create_name_index(self, objects):
+        """Create the exact name index and the name matcher for a list of idols/groups.
+
+        :returns: [{name: [objects]}, {server_id: {alias: [objects]}}, NameMatcher]
+        An object is added once for every name it has, so removing one of its names never removes another.
+        The matcher returns (object, server_id) for every name it finds, where server_id is None for global names.
+        """
+        names = {}
+        local_names = {}
+        matcher = NameMatcher()
+        for obj in objects:
+            for name in self.get_object_names(obj) + obj.aliases:
+                names.setdefault(name, []).append(obj)
+                matcher.add(name, (obj, None))
+            for server_id, aliases in obj.local_aliases.items():
+                server_names = local_names.setdefault(server_id, {})
+                for alias in aliases:
+                    server_names.setdefault(alias, []).append(obj)
+                    matcher.add(alias, (obj, server_id))
+        return [names, local_names, matcher]
+
+    def set_idol_cache(self, idols):
+        """Replace the idol cache along with its indexes."""
+        ex.cache.idol_names, ex.cache.idol_local_names, ex.cache.idol_matcher = self.create_name_index(idols)
+        ex.cache.idols_by_id = {idol.id: idol for idol in idols}
+        ex.cache.idols = idols
+        self.update_idol_pools()
+        self.invalidate_rendered_embeds()
+
+    def set_group_cache(self, groups):
+        """Replace the group cache along with its indexes."""
+        ex.cache.group_names, ex.cache.group_local_names, ex.cache.group_matcher = self.create_name_index(groups)
+        ex.cache.groups_by_id = {group.id: group for group in groups}
+        ex.cache.groups = groups
+        self.update_idol_pools()
+        self.invalidate_rendered_embeds()
+
+    @staticmethod
+    def create_idol_pools(idols, groups):
+        """Create the pools that random idols are chosen from.
+
+        :returns: [{(gender, max_difficulty): [idols with photos]}, {group_id: [members with photos]}]
+        A gender of None is both genders, and an idol is in the pools of its difficulty and every harder difficulty.
+        """
+        idol_pools = {}
+        for idol in idols:
+            if not idol.photo_count:
+                continue
+            difficulty = ex.cache.difficulty_aliases.get(idol.difficulty) or 2
+            for gender in {idol.gender, None}:
+                for max_difficulty in range(difficulty, len(ex.cache.difficulty_levels) + 1):
+                    idol_pools.setdefault((gender, max_difficulty), []).append(idol)
+        group_photo_members = {}
+        for group in groups:
+            members = [ex.cache.idols_by_id.get(member_id) for member_id in group.members]
+            members = [member for member in members if member and member.photo_count]
+            if members:
+                group_photo_members[group.id] = members
+        return [idol_pools, group_photo_members]
+
+    def update_idol_pools(self):
+        """Rebuild the random idol pools from the current idols and groups."""
+        ex.cache.idol_pools, ex.cache.group_photo_members = self.create_idol_pools(ex.cache.idols, ex.cache.groups)
+
+    def get_name_index(self, obj, server_id=None):
+        """Get the name index that an idol/group name belongs in and the matcher of the idols/groups."""
+        if self.check_idol_object(obj):
+            names, local_names, matcher = ex.cache.idol_names, ex.cache.idol_local_names, ex.cache.idol_matcher
+        else:
+            names, local_names, matcher = ex.cache.group_names, ex.cache.group_local_names, ex.cache.group_matcher
+        if server_id:
+            return local_names.setdefault(server_id, {}), matcher
+        return names, matcher
+
+    def add_to_name_index(self, obj, name, server_id=None):
+        """Add a name of an idol/group to the name index and matcher."""
+        index, matcher = self.get_name_index(obj, server_id)
+        index.setdefault(name, []).append(obj)
+        matcher.add(name, (obj, server_id or None))
+        self.invalidate_rendered_embeds()
+
+    def remove_from_name_index(self, obj, name, server_id=None):
+        """Remove a name of an idol/group from the name index and matcher."""
+        index, matcher = self.get_name_index(obj, server_id)
+        objects = index.get(name)
+        if objects and obj in objects:
+            objects.remove(obj)
+            if not objects:
+                index.pop(name, None)
+        matcher.remove(name, (obj, server_id or None))
+        self.invalidate_rendered_embeds()
+
+    @staticmethod
+    def get_matcher_results(matcher, text, server_id=None):
+        """Find the idols/groups whose names or aliases (including the aliases of a server) are in a text.
+
+        :returns: [(start, end, object)]
+        """
+        return [(start, end, obj) for start, end, (obj, obj_server_id) in matcher.search(text)
+                if not obj_server_id or obj_server_id == server_id]
+
+    @staticmethod
+    def get_name_matches(names, local_names, name, server_id=None):
+        """Get the idols/groups that are called exactly by a name, including the aliases of a server."""
+        matches = list(names.get(name) or [])
+        if server_id:
+            matches += (local_names.get(server_id) or {}).get(name) or []
+        # remove any duplicates
+        return list(dict.fromkeys(matches))
+
     async def set_global_alias(self, obj, alias):
         """Set an idol/group alias for the bot."""
         obj.aliases.append(alias)
+        self.add_to_name_index(obj, alias)
         is_group = int(not self.check_idol_object(obj))
         await ex.conn.execute("INSERT INTO groupmembers.aliases(objectid, alias, isgroup) VALUES($1, $2, $3)", obj.id,
                               alias, is_group)
@@ -50,6 +212,7 @@ class GroupMembers:
             local_aliases.append(alias)
         else:
             obj.local_aliases[server_id] = [alias]
+        self.add_to_name_index(obj, alias, server_id)
         is_group = int(not self.check_idol_object(obj))
         await ex.conn.execute(
             "INSERT INTO groupmembers.aliases(objectid, alias, isgroup, serverid) VALUES($1, $2, $3, $4)", obj.id,
@@ -58,6 +221,7 @@ class GroupMembers:
     async def remove_global_alias(self, obj, alias):
         """Remove a global idol/group alias """
         obj.aliases.remove(alias)
+        self.remove_from_name_index(obj, alias)
         is_group = int(not self.check_idol_object(obj))
         await ex.conn.execute(
             "DELETE FROM groupmembers.aliases WHERE alias = $1 AND isgroup = $2 AND objectid = $3 AND serverid IS NULL",
@@ -69,6 +233,7 @@ class GroupMembers:
         local_aliases = obj.local_aliases.get(server_id)
         if local_aliases:
             local_aliases.remove(alias)
+            self.remove_from_name_index(obj, alias, server_id)
         await ex.conn.execute(
             "DELETE FROM groupmembers.aliases WHERE alias = $1 AND isgroup = $2 AND serverid = $3 AND objectid = $4",
             alias, is_group, server_id, obj.id)
@@ -82,9 +247,7 @@ class GroupMembers:
             # purposefully create an error if an idol id was not passed in. This is useful to not check for it
             # in other commands.
             return
-        for idol in ex.cache.idols:
-            if idol.id == idol_id:
-                return idol
+        return ex.cache.idols_by_id.get(idol_id)
 
     @staticmethod
     async def get_group(group_id):
@@ -95,12 +258,35 @@ class GroupMembers:
             # purposefully create an error if a group id was not passed in. This is useful to not check for it
             # in other commands.
             return
-        for group in ex.cache.groups:
-            if group.id == group_id:
-                return group
+        return ex.cache.groups_by_id.get(group_id)
 
     async def set_embed_card_info(self, obj, group=False, server_id=None):
-        """Sets General Information about a Group or Idol."""
+        """Sets General Information about a Group or Idol.
+
+        The card is rendered once per cache generation and copied for every request.
+        """
+        if not obj.local_aliases.get(server_id):
+            # every server without its own aliases shares the same card.
+            server_id = None
+        key = (obj.id, group, server_id, self.cache_generation)
+        card = self.card_cache.get(key)
+        if not card:
+            card = await self.render_card(obj, group, server_id)
+            self.card_cache[key] = card
+        embed_dict, description_head, description_tail = card
+        embed_dict = copy.deepcopy(embed_dict)
+        # the called count changes with every idol post, so it is added to the description on every request.
+        called = f"Called: {obj.called} times\n" if not group and obj.called else ""
+        embed_dict['description'] = f"{description_head}{called}{description_tail}"
+        embed = discord.Embed.from_dict(embed_dict)
+        embed.colour = ex.get_random_color()
+        return embed
+
+    async def render_card(self, obj, group=False, server_id=None):
+        """Render the information of a Group or Idol that only changes with the cache.
+
+        :returns: [embed as a dict, description before the called count, description after the called count]
+        """
         description = ""
         if obj.description:
             description += f"{obj.description}\n\n"
@@ -122,6 +308,8 @@ class GroupMembers:
                 description += f"Company: {obj.company}\n"
             if obj.website:
                 description += f"[Official Website]({obj.website})\n"
+            description_head = description
+            description = ""
         else:
             title = f"{obj.full_name} ({obj.stage_name}) [{obj.id}]\n"
             if obj.full_name:
@@ -144,9 +332,8 @@ class GroupMembers:
                 description += f"Zodiac Sign: {obj.zodiac}\n"
             if obj.blood_type:
                 description += f"Blood Type: {obj.blood_type}\n"
-            if obj.called:
-                description += f"Called: {obj.called} times\n"
-            description += f"GuessingGame Difficulty: {obj.difficulty}\n"
+            description_head = description
+            description = f"GuessingGame Difficulty: {obj.difficulty}\n"
         if obj.twitter:
             description += f"[Twitter](https://twitter.com/{obj.twitter})\n"
         if obj.youtube:
@@ -167,7 +354,8 @@ class GroupMembers:
             description += f"[TikTok](https://www.tiktok.com/{obj.tiktok})\n"
         if obj.photo_count:
             description += f"Photo Count: {obj.photo_count}\n"
-        embed = await ex.create_embed(title=title, color=ex.get_random_color(), title_desc=description)
+        description_tail = description
+        embed = await ex.create_embed(title=title)
         if obj.tags:
             embed.add_field(name="Tags", value=', '.join(obj.tags), inline=False)
         if obj.aliases:
@@ -190,22 +378,16 @@ class GroupMembers:
             embed.set_thumbnail(url=obj.thumbnail)
         if obj.banner:
             embed.set_image(url=obj.banner)
-        return embed
+        return [embed.to_dict(), description_head, description_tail]
 
     async def get_group_names_as_string(self, idol):
         """Get the group names split by a | ."""
-        # note that this used to be simplified to one line, but in the case there are groups that do not exist,
-        # a proper check and deletion of fake groups are required
+        # groups that do not exist are skipped rather than removing their connections while rendering.
         group_names = []
         for group_id in idol.groups:
             group = await self.get_group(group_id)
             if group:
                 group_names.append(f"{group.name} ({group_id})")
-            else:
-                # make sure the cache exists first before deleting.
-                if ex.cache.groups:
-                    # delete the group connections if it doesn't exist.
-                    await ex.conn.execute("DELETE FROM groupmembers.idoltogroup WHERE groupid = $1", group_id)
         return f"{' | '.join(group_names)}\n"
 
     @staticmethod
@@ -217,6 +399,13 @@ class GroupMembers:
                 return False  # returns False if they are restricted.
         return True
 
+    @staticmethod
+    async def add_restricted_channel_to_cache(channel_id, server_id, send_all):
+        """Adds restricted channel to cache."""
+        ex.cache.restricted_channels[channel_id] = [server_id, send_all]
+        if send_all:
+            ex.cache.send_here_channels[server_id] = channel_id
+
     @staticmethod
     async def delete_restricted_channel_from_cache(channel_id, send_all):
         """Deletes restricted channel from cache."""
@@ -224,22 +413,21 @@ class GroupMembers:
         if r_channel:
             if r_channel[1] == send_all:
                 ex.cache.restricted_channels.pop(channel_id)
+                if send_all and ex.cache.send_here_channels.get(r_channel[0]) == channel_id:
+                    ex.cache.send_here_channels.pop(r_channel[0], None)
 
     @staticmethod
     async def check_server_sending_photos(server_id):
         """Checks a server to see if it has a specific channel to send idol photos to"""
-        for channel in ex.cache.restricted_channels:
-            channel_info = ex.cache.restricted_channels.get(channel)
-            if channel_info[0] == server_id and channel_info[1] == 1:
-                return True  # returns True if they are supposed to send it to a specific channel.
+        # returns True if they are supposed to send it to a specific channel.
+        return server_id in ex.cache.send_here_channels
 
     @staticmethod
     async def get_channel_sending_photos(server_id):
         """Returns a text channel from a server that requires idol photos to be sent to a specific text channel."""
-        for channel_id in ex.cache.restricted_channels:
-            channel_info = ex.cache.restricted_channels.get(channel_id)
-            if channel_info[0] == server_id and channel_info[1] == 1:
-                return ex.client.get_channel(channel_id)
+        channel_id = ex.cache.send_here_channels.get(server_id)
+        if channel_id:
+            return ex.client.get_channel(channel_id)
 
     @staticmethod
     def log_idol_command(message):
@@ -258,12 +446,25 @@ class GroupMembers:
         return ex.first_result(
             await ex.conn.fetchrow("SELECT Count FROM groupmembers.Count WHERE MemberID = $1", member_id))
 
-    async def get_random_idol(self):
-        """Get a random idol with at least 1 photo."""
-        idol = random.choice(ex.cache.idols)
-        if not idol.photo_count:
-            idol = await self.get_random_idol()
-        return idol
+    @staticmethod
+    async def get_random_idol(gender=None, difficulty=3):
+        """Get a random idol with at least 1 photo.
+
+        :param gender: 'm' or 'f' to choose from one gender. None chooses from both.
+        :param difficulty: the hardest difficulty level (1 - 3) the idol can have.
+        :raises ex.exceptions.NoIdolFound: if no idol meets the requirements.
+        """
+        idols = ex.cache.idol_pools.get((gender, difficulty))
+        if not idols:
+            raise ex.exceptions.NoIdolFound
+        return random.choice(idols)
+
+    @staticmethod
+    async def get_random_group_member(group):
+        """Get a random member with at least 1 photo from a group. Returns None if no member has a photo."""
+        members = ex.cache.group_photo_members.get(group.id)
+        if members:
+            return random.choice(members)
 
     @staticmethod
     async def get_db_all_members():
@@ -273,6 +474,22 @@ class GroupMembers:
             fancafe, facebook, tiktok, zodiac, thumbnail, banner, bloodtype, tags, difficulty
              FROM groupmembers.Member ORDER BY id""")
 
+    @staticmethod
+    async def get_db_member(idol_id):
+        """Get an idol from the database."""
+        return await ex.conn.fetchrow("""SELECT id, fullname, stagename, formerfullname, formerstagename, birthdate,
+            birthcountry, birthcity, gender, description, height, twitter, youtube, melon, instagram, vlive, spotify,
+            fancafe, facebook, tiktok, zodiac, thumbnail, banner, bloodtype, tags, difficulty
+             FROM groupmembers.Member WHERE id = $1""", idol_id)
+
+    @staticmethod
+    async def get_db_group(group_id):
+        """Get a group from the database."""
+        return await ex.conn.fetchrow("""SELECT groupid, groupname, debutdate, disbanddate, description, twitter, youtube,
+                                         melon, instagram, vlive, spotify, fancafe, facebook, tiktok, fandom, company,
+                                          website, thumbnail, banner, gender, tags FROM groupmembers.groups
+                                          WHERE groupid = $1""", group_id)
+
     @staticmethod
     async def get_all_groups():
         """Get all groups."""
@@ -314,6 +531,65 @@ class GroupMembers:
         groups = await ex.conn.fetch("SELECT groupid FROM groupmembers.idoltogroup WHERE idolid = $1", member_id)
         return [group[0] for group in groups]
 
+    @staticmethod
+    async def get_db_all_aliases(group=False):
+        """Get the aliases of every idol or group from the database with a single query.
+
+        :returns: { object_id: [global_aliases, local_aliases] }
+        """
+        aliases = ex.u_cache.count_rows(await ex.conn.fetch(
+            "SELECT objectid, alias, serverid FROM groupmembers.aliases WHERE isgroup = $1", int(group)))
+        all_aliases = {}
+        for object_id, alias, server_id in aliases:
+            object_aliases = all_aliases.get(object_id)
+            if not object_aliases:
+                object_aliases = [[], {}]
+                all_aliases[object_id] = object_aliases
+            global_aliases, local_aliases = object_aliases
+            if server_id:
+                server_list = local_aliases.get(server_id)
+                if server_list:
+                    server_list.append(alias)
+                else:
+                    local_aliases[server_id] = [alias]
+            else:
+                global_aliases.append(alias)
+        return all_aliases
+
+    @staticmethod
+    async def get_db_all_idol_to_group():
+        """Get every idol to group connection from the database with a single query.
+
+        :returns: ({ idol_id: [group_ids] }, { group_id: [idol_ids] }) with duplicates removed.
+        """
+        idol_groups = {}
+        group_members = {}
+        connections = ex.u_cache.count_rows(await ex.conn.fetch("SELECT idolid, groupid FROM groupmembers.idoltogroup"))
+        for idol_id, group_id in connections:
+            groups = idol_groups.get(idol_id)
+            if groups:
+                groups[group_id] = None
+            else:
+                idol_groups[idol_id] = {group_id: None}
+            members = group_members.get(group_id)
+            if members:
+                members[idol_id] = None
+            else:
+                group_members[group_id] = {idol_id: None}
+        # dicts were used as ordered sets to remove potential duplicates.
+        idol_groups = {idol_id: list(groups) for idol_id, groups in idol_groups.items()}
+        group_members = {group_id: list(members) for group_id, members in group_members.items()}
+        return idol_groups, group_members
+
+    @staticmethod
+    async def get_db_all_idol_called():
+        """Get the amount of times every idol has been called from the database with a single query.
+
+        :returns: { idol_id: amount_called }
+        """
+        counts = ex.u_cache.count_rows(await ex.conn.fetch("SELECT memberid, count FROM groupmembers.count"))
+        return {member_id: count for member_id, count in counts}
+
     @staticmethod
     async def add_idol_to_group(member_id: int, group_id: int):
         return await ex.conn.execute("INSERT INTO groupmembers.idoltogroup(idolid, groupid) VALUES($1, $2)",
@@ -324,59 +600,51 @@ class GroupMembers:
         return await ex.conn.execute("DELETE FROM groupmembers.idoltogroup WHERE idolid = $1 AND groupid = $2",
                                      member_id, group_id)
 
+    def get_name_fields(self, mode, is_mod):
+        """Get the field of every group in the idol list. Cached until idols or groups change.
+
+        :returns: [(group_id, field name, names of the members)]
+        """
+        key = ("names", mode, is_mod, self.cache_generation)
+        fields = self.page_cache.get(key)
+        if fields is None:
+            fields = []
+            for group in ex.cache.groups:
+                if (group.name == "NULL" or group.photo_count == 0) and not is_mod:
+                    continue
+                names = []
+                for member_id in group.members:
+                    member = ex.cache.idols_by_id.get(member_id)
+                    if not member or not (member.photo_count or is_mod):
+                        continue
+                    member_name = member.full_name if mode == "fullname" else member.stage_name
+                    names.append(f"{member_name} ({member.id}) | " if is_mod else f"{member_name} | ")
+                field_name = f"{group.name} ({group.id})" if is_mod else f"{group.name}"
+                fields.append((group.id, field_name, "".join(names) or "None"))
+            self.page_cache[key] = fields
+        return fields
+
     async def send_names(self, ctx, mode, user_page_number=1, group_ids=None):
         """Send the names of all idols in an embed with many pages."""
         server_prefix = await ex.get_server_prefix_by_context(ctx)
-
-        async def check_mode(embed_temp):
-            """Check if it is grabbing their full names or stage names."""
-            if mode == "fullname":
-                embed_temp = await ex.set_embed_author_and_footer(embed_temp,
-                                                                  f"Type {server_prefix}members for Stage Names.")
-            else:
-                embed_temp = await ex.set_embed_author_and_footer(embed_temp,
-                                                                  f"Type {server_prefix}fullnames for Full Names.")
-            return embed_temp
-
-        is_mod = ex.check_if_mod(ctx)
-        embed_lists = []
-        page_number = 1
-        embed = discord.Embed(title=f"Idol List Page {page_number}", color=0xffb6c1)
-        counter = 1
-        for group in ex.cache.groups:
-            names = []
-            if (group.name != "NULL" and group.photo_count != 0) or is_mod:
-                if not group_ids or group.id in group_ids:
-                    for group_member in group.members:
-                        member = await self.get_member(group_member)
-                        if member:
-                            if member.photo_count or is_mod:
-                                if mode == "fullname":
-                                    member_name = member.full_name
-                                else:
-                                    member_name = member.stage_name
-                                if is_mod:
-                                    names.append(f"{member_name} ({member.id}) | ")
-                                else:
-                                    names.append(f"{member_name} | ")
-                    final_names = "".join(names)
-                    if not final_names:
-                        final_names = "None"
-                    if is_mod:
-                        embed.insert_field_at(counter, name=f"{group.name} ({group.id})", value=final_names,
-                                              inline=False)
-                    else:
-                        embed.insert_field_at(counter, name=f"{group.name}", value=final_names, inline=False)
-                    if counter == 10:
-                        page_number += 1
-                        await check_mode(embed)
-                        embed_lists.append(embed)
-                        embed = discord.Embed(title=f"Idol List Page {page_number}", color=0xffb6c1)
-                        counter = 0
-                    counter += 1
-        # if counter did not reach 10, current embed needs to be saved.
-        await check_mode(embed)
-        embed_lists.append(embed)
+        if mode == "fullname":
+            footer = f"Type {server_prefix}members for Stage Names."
+        else:
+            footer = f"Type {server_prefix}fullnames for Full Names."
+        template = (await ex.set_embed_author_and_footer(discord.Embed(color=0xffb6c1), footer)).to_dict()
+
+        def render_page(page_index, page):
+            embed = discord.Embed.from_dict(copy.deepcopy(template))
+            embed.title = f"Idol List Page {page_index + 1}"
+            for group_id, field_name, names in page:
+                embed.add_field(name=field_name, value=names, inline=False)
+            return embed
+
+        fields = self.get_name_fields(mode, ex.check_if_mod(ctx))
+        if group_ids:
+            group_ids = set(group_ids)
+            fields = [field for field in fields if field[0] in group_ids]
+        embed_lists = LazyEmbedList(LazyEmbedList.split_pages(fields, 10) or [[]], render_page)
         if user_page_number > len(embed_lists) or user_page_number < 1:
             user_page_number = 1
         msg = await ctx.send(embed=embed_lists[user_page_number - 1])
@@ -420,43 +688,40 @@ class GroupMembers:
             embed_list.append(embed)
         return embed_list
 
-    @staticmethod
-    async def set_embed_with_all_aliases(mode, server_id=None):
+    async def set_embed_with_all_aliases(self, mode, server_id=None):
         """Send the names of all aliases in an embed with many pages."""
-
-        def create_embed():
-            return discord.Embed(title=f"{mode} Global/Local Aliases Page {page_number}", color=ex.get_random_color())
-
         if mode == "Group":
             all_info = ex.cache.groups
             is_group = True
+            local_names = ex.cache.group_local_names
         else:
             all_info = ex.cache.idols
             is_group = False
-        embed_list = []
-        count = 0
-        page_number = 1
-        embed = create_embed()
-        for info in all_info:
-            aliases = ",".join(info.aliases)
-            local_aliases = info.local_aliases.get(server_id)
-            if local_aliases:
-                aliases += ", ".join(local_aliases)
-            if aliases:
-                if not is_group:
-                    embed.add_field(name=f"{info.full_name} ({info.stage_name}) [{info.id}]", value=aliases,
-                                    inline=True)
-                else:
-                    embed.add_field(name=f"{info.name} [{info.id}]", value=aliases, inline=True)
-                count += 1
-            if count == 10:
-                count = 0
-                embed_list.append(embed)
-                page_number += 1
-                embed = create_embed()
-        if count != 0:
-            embed_list.append(embed)
-        return embed_list
+            local_names = ex.cache.idol_local_names
+        if not local_names.get(server_id):
+            # the pages are the same for every server without its own aliases.
+            server_id = None
+        key = ("aliases", mode, server_id, self.cache_generation)
+        pages = self.page_cache.get(key)
+        if pages is None:
+            fields = []
+            for info in all_info:
+                aliases = ", ".join(list(info.aliases) + (info.local_aliases.get(server_id) or []))
+                if aliases:
+                    if not is_group:
+                        fields.append((f"{info.full_name} ({info.stage_name}) [{info.id}]", aliases))
+                    else:
+                        fields.append((f"{info.name} [{info.id}]", aliases))
+            pages = self.page_cache[key] = LazyEmbedList.split_pages(fields, 10)
+
+        def render_page(page_index, page):
+            embed = discord.Embed(title=f"{mode} Global/Local Aliases Page {page_index + 1}",
+                                  color=ex.get_random_color())
+            for field_name, aliases in page:
+                embed.add_field(name=field_name, value=aliases, inline=True)
+            return embed
+
+        return LazyEmbedList(pages, render_page)
 
     async def check_idol_post_reactions(self, message, user_msg, idol, link, guessing_game=False):
         """Check the reactions on an idol post or guessing game."""
@@ -467,17 +732,15 @@ class GroupMembers:
                 if not guessing_game:
                     await message.add_reaction(reload_image_emoji)
                 await message.add_reaction(dead_link_emoji)
-                message = await message.channel.fetch_message(message.id)
 
-                def image_check(user_reaction, reaction_user):
+                def image_check(payload):
                     """check the user that reacted to it and which emoji it was."""
-                    user_check = (reaction_user == user_msg.author) or (
-                                reaction_user.id == owner_id) or reaction_user.id in mods_list
-                    dead_link_check = str(user_reaction.emoji) == dead_link_emoji
-                    reload_image_check = str(user_reaction.emoji) == reload_image_emoji
-                    guessing_game_check = user_check and dead_link_check and user_reaction.message.id == message.id
-                    idol_post_check = user_check and (
-                                dead_link_check or reload_image_check) and user_reaction.message.id == message.id
+                    user_check = (payload.user_id == user_msg.author.id) or (
+                                payload.user_id == owner_id) or payload.user_id in mods_list
+                    dead_link_check = str(payload.emoji) == dead_link_emoji
+                    reload_image_check = str(payload.emoji) == reload_image_emoji
+                    guessing_game_check = user_check and dead_link_check
+                    idol_post_check = user_check and (dead_link_check or reload_image_check)
                     if guessing_game:
                         return guessing_game_check
                     return idol_post_check
@@ -485,14 +748,15 @@ class GroupMembers:
                 async def reload_image():
                     """Wait for a user to react, and reload the image if it's the reload emoji."""
                     try:
-                        reaction, user = await ex.client.wait_for('reaction_add', check=image_check, timeout=60)
-                        if str(reaction) == reload_image_emoji:
+                        payload = await ex.u_reactions.wait_for_reaction(message.id, image_check, timeout=60)
+                        if str(payload.emoji) == reload_image_emoji:
                             channel = message.channel
                             await message.delete()
                             # message1 = await channel.send(embed=embed)
                             message1 = await channel.send(link)
                             await self.check_idol_post_reactions(message1, user_msg, idol, link)
-                        elif str(reaction) == dead_link_emoji:
+                        elif str(payload.emoji) == dead_link_emoji:
+                            user = ex.client.get_user(payload.user_id) or await ex.client.fetch_user(payload.user_id)
                             if await ex.u_patreon.check_if_patreon(user.id):
                                 await message.delete()
                             else:
@@ -551,88 +815,31 @@ class GroupMembers:
             log.console(f"Send Dead Image - {e}")
 
     async def get_idol_where_member_matches_name(self, name, mode=0, server_id=None):
-        """Get idol object if the name matches an idol"""
-        idol_list = []
-        name = name.lower()
-        for idol in ex.cache.idols:
-            local_aliases = None
-            if server_id:
-                local_aliases = idol.local_aliases.get(server_id)
-            if not mode:
-                if idol.full_name and idol.stage_name:
-                    if name == idol.full_name.lower() or name == idol.stage_name.lower():
-                        idol_list.append(idol)
-            else:
-                if idol.full_name and idol.stage_name:
-                    if idol.stage_name.lower() in name or idol.full_name.lower() in name:
-                        idol_list.append(idol)
-            for alias in idol.aliases:
-                if not mode:
-                    if alias == name:
-                        idol_list.append(idol)
-                else:
-                    if alias in name:
-                        idol_list.append(idol)
-            if local_aliases:
-                for alias in local_aliases:
-                    if await self.check_to_add_alias_to_list(alias, name, mode):
-                        idol_list.append(idol)
-
-        # remove any duplicates
-        idols = list(dict.fromkeys(idol_list))
-        return idols
+        """Get idol object if the name matches an idol
 
-    @staticmethod
-    async def check_to_add_alias_to_list(alias, name, mode=0):
-        """Check whether to add an alias to a list. Compares a name with an existing alias."""
+        mode 0 -> the name is exactly the name or alias of an idol.
+        mode 1 -> the name contains the name or alias of an idol.
+        """
+        name = name.lower()
         if not mode:
-            if alias == name:
-                return True
-        else:
-            if alias in name:
-                return True
-        return False
+            return self.get_name_matches(ex.cache.idol_names, ex.cache.idol_local_names, name, server_id)
+        matches = self.get_matcher_results(ex.cache.idol_matcher, name, server_id)
+        # remove any duplicates
+        return list(dict.fromkeys(idol for start, end, idol in matches))
 
     async def get_group_where_group_matches_name(self, name, mode=0, server_id=None):
-        """Get group ids for a specific name."""
-        group_list = []
-        name = name.lower()
-        for group in ex.cache.groups:
-            try:
-                aliases = group.aliases
-                local_aliases = None
-                if server_id:
-                    local_aliases = group.local_aliases.get(server_id)
-                if not mode:
-                    if group.name:
-                        if name == group.name.lower():
-                            group_list.append(group)
-                else:
-                    if group.name:
-                        if group.name.lower() in name:
-                            group_list.append(group)
-                            name = (name.lower()).replace(group.name, "")
-                for alias in aliases:
-                    if await self.check_to_add_alias_to_list(alias, name, mode):
-                        group_list.append(group)
-                        if mode:
-                            name = (name.lower()).replace(alias, "")
-                if local_aliases:
-                    for alias in local_aliases:
-                        if await self.check_to_add_alias_to_list(alias, name, mode):
-                            group_list.append(group)
-                            if mode:
-                                name = (name.lower()).replace(alias, "")
+        """Get group ids for a specific name.
 
-            except Exception as e:
-                log.console(e)
-        # remove any duplicates
-        group_list = list(dict.fromkeys(group_list))
-        # print(id_list)
+        mode 0 -> returns the groups that are exactly called by the name.
+        mode 1 -> returns the groups with a name or alias in the name, and the name with those group names removed.
+        """
+        name = name.lower()
         if not mode:
-            return group_list
-        else:
-            return group_list, name
+            return self.get_name_matches(ex.cache.group_names, ex.cache.group_local_names, name, server_id)
+        matches = self.get_matcher_results(ex.cache.group_matcher, name, server_id)
+        # remove any duplicates
+        group_list = list(dict.fromkeys(group for start, end, group in matches))
+        return group_list, NameMatcher.remove_spans(name, [(start, end) for start, end, group in matches])
 
     async def process_names(self, ctx, page_number_or_group, mode):
         """Structures the input for idol names commands and sends information to transfer the names to the channels."""
@@ -658,14 +865,8 @@ class GroupMembers:
 
     @staticmethod
     async def update_member_count(idol):
-        """Update the amount of times an idol has been called."""
-        if not idol.called:
-            idol.called = 1
-            await ex.conn.execute("INSERT INTO groupmembers.count VALUES($1, $2)", idol.id, 1)
-        else:
-            idol.called += 1
-            await ex.conn.execute("UPDATE groupmembers.Count SET Count = $1 WHERE MemberID = $2", idol.called,
-                                    idol.id)
+        """Update the amount of times an idol has been called. The database is updated in the background."""
+        ex.u_write_behind.add_idol_call(idol)
 
     @staticmethod
     async def set_as_group_photo(link):
@@ -681,70 +882,65 @@ class GroupMembers:
                             special_message=None, guessing_game=False, scores=None):
         """Get the image link from the API and return the message containing the image."""
 
-        async def post_msg(m_file=None, m_embed=None, repeated=0):
+        async def post_msg(m_file=None, m_embed=None):
             """Send the message to the channel and return it."""
-            message = None
-            try:
-                if not special_message:
-                    message = await channel.send(embed=m_embed, file=m_file)
-                else:
-                    message = await channel.send(special_message, embed=m_embed, file=m_file)
-            except:
-                # cannot access API or API Link -> attempt to post it 5 times.
-                # this happens because the image link may not be properly registered.
-                if repeated < 5:
-                    if not message:
-                        await asyncio.sleep(0.5)
-                        message = await post_msg(m_file=m_file, m_embed=m_embed, repeated=repeated + 1)
-            return message
+            # cannot access API or API Link -> attempt to post it 5 times.
+            # this happens because the image link may not be properly registered.
+            for repeated in range(5):
+                try:
+                    if not special_message:
+                        return await channel.send(embed=m_embed, file=m_file)
+                    return await channel.send(special_message, embed=m_embed, file=m_file)
+                except:
+                    # jittered exponential backoff so the retries of many posts do not line up.
+                    await asyncio.sleep(random.uniform(0, 0.25 * 2 ** repeated))
 
         file = None
+        if not api_url:
+            # use a photo link that was already fetched from the API if there is one.
+            api_url = ex.u_photo_pool.get_photo(idol.id, guessing_game)
         if not api_url:
             try:
-                find_post = True
-
-                data = {
-                    'p_key':  translate_private_key,
-                    'no_group_photos': int(guessing_game)
-                }
-                end_point = f"http://127.0.0.1:{ api_port}/photos/{idol.id}"
-                if ex.test_bot:
-                    end_point = f"https://api.irenebot.com/photos/{idol.id}"
-                while find_post:  # guarantee we get a post sent to the user.
-                    async with ex.session.post(end_point, data=data) as r:
-                        ex.cache.bot_api_idol_calls += 1
-                        if r.status == 200 or r.status == 301:
-                            api_url = r.url
-                            find_post = False
-                        elif r.status == 415:
-                            # video
-                            if guessing_game:
-                                # do not allow videos in the guessing game.
-                                return self.get_image_msg(idol, group_id, channel, photo_link, user_id, guild_id,
-                                                          api_url, special_message, guessing_game, scores)
-                            url_data = json.loads(await r.text())
+                # a new photo is requested if the API sends a video that can not be posted.
+                for attempt in range(3):
+                    try:
+                        response = await ex.u_api.get_idol_photo(idol.id, guessing_game)
+                    except ex.exceptions.APIUnavailable:
+                        msg = await channel.send("> **The API is currently busy. Please try again in a moment.**")
+                        log.console("API is currently being overloaded with requests or is down.")
+                        return msg, None
+                    if response.status == 200 or response.status == 301:
+                        api_url = response.url
+                        break
+                    elif response.status == 415:
+                        # video
+                        if guessing_game:
+                            # do not allow videos in the guessing game.
+                            continue
+                        url_data = json.loads(response.body)
+                        file_location = url_data.get('location')
+                        file_size = os.path.getsize(file_location)
+                        if file_size < 8388608:  # 8 MB
                             api_url = url_data.get('final_image_link')
-                            file_location = url_data.get('location')
-                            file_name = url_data.get('file_name')
-                            file_size = os.path.getsize(file_location)
-                            if file_size < 8388608:  # 8 MB
-                                file = discord.File(file_location, file_name)
-                                find_post = False
-                        elif r.status == 403:
-                            log.console("API Key Missing or Invalid Key.")
-                            find_post = False
-                        elif r.status == 404 or r.status == 400:
-                            # No photos were found.
-                            log.console(f"No photos were found for this idol ({idol.id}).")
-                            msg = await channel.send(f"**No photos were found for this idol ({idol.id}).**")
-                            return msg, None
-                        elif r.status == 502:
-                            msg = await channel.send("API is currently being overloaded with requests.")
-                            log.console("API is currently being overloaded with requests or is down.")
-                            return msg, None
-                        else:
-                            # error unaccounted for.
-                            log.console(f"{r.status} - Status Code from API.")
+                            file = discord.File(file_location, url_data.get('file_name'))
+                            break
+                    elif response.status == 403:
+                        log.console("API Key Missing or Invalid Key.")
+                        return None, None
+                    elif response.status == 404 or response.status == 400:
+                        # No photos were found.
+                        log.console(f"No photos were found for this idol ({idol.id}).")
+                        msg = await channel.send(f"**No photos were found for this idol ({idol.id}).**")
+                        return msg, None
+                    else:
+                        msg = await channel.send("> **The API is currently busy. Please try again in a moment.**")
+                        log.console(f"{response.status} - Status Code from API.")
+                        return msg, None
+                else:
+                    # every attempt returned a video that could not be posted.
+                    msg = await channel.send("> **The API is currently busy. Please try again in a moment.**")
+                    log.console(f"Only videos were received for this idol ({idol.id}).")
+                    return msg, None
             except Exception as e:
                 log.console(e)
 
@@ -769,10 +965,6 @@ class GroupMembers:
                 raise Exception
 
         except Exception as e:
-            ex.api_issues += 1
-            if ex.api_issues >= 50:
-                await ex.kill_api()
-                ex.api_issues = 0
             await channel.send(
                 f"> An API issue has occurred. If this is constantly occurring, please join our support server.")
             log.console(
@@ -784,19 +976,25 @@ class GroupMembers:
                                   scores=None):
         """The embed for an idol post."""
         if not guessing_game:
-            if not group_id:
-                embed = discord.Embed(title=f"{idol.full_name} ({idol.stage_name}) [{idol.id}]", color=ex.get_random_color(),
-                                      url=photo_link)
-            else:
-                group = await self.get_group(group_id)
-                embed = discord.Embed(title=f"{group.name} ({idol.stage_name}) [{idol.id}]",
-                                      color=ex.get_random_color(), url=photo_link)
-            patron_msg = f"Please consider becoming a {await ex.get_server_prefix(guild_id)}patreon."
+            key = (idol.id, group_id, self.cache_generation)
+            template = self.post_templates.get(key)
+            if not template:
+                if not group_id:
+                    title = f"{idol.full_name} ({idol.stage_name}) [{idol.id}]"
+                else:
+                    group = await self.get_group(group_id)
+                    title = f"{group.name} ({idol.stage_name}) [{idol.id}]"
+                template = discord.Embed(title=title).to_dict()
+                self.post_templates[key] = template
+            # the template only contains strings, so a shallow copy is enough.
+            embed = discord.Embed.from_dict(dict(template))
+            embed.url = photo_link
+            embed.colour = ex.get_random_color()
 
             # when user_id is None, the post goes to the dead images channel.
             if user_id:
                 if not await ex.u_patreon.check_if_patreon(user_id):
-                    embed.set_footer(text=patron_msg)
+                    embed.set_footer(text=f"Please consider becoming a {await ex.get_server_prefix(guild_id)}patreon.")
         else:
             current_scores = ""
             if scores:
@@ -815,8 +1013,6 @@ class GroupMembers:
                                                         guild_id=channel.guild.id, api_url=photo_link,
                                                         special_message=special_message, guessing_game=guessing_game,
                                                         scores=scores)
-                if not msg and not api_url:
-                    ex.api_issues += 1
                 await self.update_member_count(idol)
             except:
                 if guessing_game:
@@ -830,7 +1026,46 @@ class GroupMembers:
             log.console(e)
             return None, None
 
+    @staticmethod
+    def get_compact_savings(objects):
+        """Estimate the bytes saved by idol/group objects using slots, interned strings, and tuples for tags.
+
+        :returns: [bytes saved by slots, bytes saved by interning, bytes saved by tuples]
+        """
+        class DictObject:
+            """An object with an instance __dict__ to compare the slotted objects with."""
+
+        dict_object_size = sys.getsizeof(DictObject())
+        slot_savings, intern_savings, tuple_savings = 0, 0, 0
+        interned_counts = {}  # { id(string): [string, references] }
+        for obj in objects:
+            attributes = {slot: getattr(obj, slot, None) for slot in obj.__slots__}
+            slot_savings += dict_object_size + sys.getsizeof(attributes) - sys.getsizeof(obj)
+            if obj.tags:
+                tuple_savings += sys.getsizeof(list(obj.tags)) - sys.getsizeof(obj.tags)
+            interned = [attributes.get(attribute) for attribute in
+                        ('birth_country', 'birth_city', 'gender', 'zodiac', 'blood_type', 'difficulty', 'company')]
+            interned.extend(obj.tags or [])
+            for value in interned:
+                if isinstance(value, str):
+                    string_count = interned_counts.get(id(value))
+                    if string_count:
+                        string_count[1] += 1
+                    else:
+                        interned_counts[id(value)] = [value, 1]
+        for value, references in interned_counts.values():
+            # without interning, every reference would have its own copy of the string.
+            intern_savings += sys.getsizeof(value) * (references - 1)
+        return [slot_savings, intern_savings, tuple_savings]
+
     class Idol:
+        # slots are used instead of an instance __dict__ since thousands of idols are kept in cache.
+        __slots__ = ('id', 'full_name', 'stage_name', 'former_full_name', 'former_stage_name', 'birth_date',
+                     'birth_country', 'birth_city', 'gender', 'description', 'height', 'twitter', 'youtube',
+                     'melon', 'instagram', 'vlive', 'spotify', 'fancafe', 'facebook', 'tiktok', 'aliases',
+                     'local_aliases', 'groups', 'zodiac', 'thumbnail', 'banner', 'blood_type', 'photo_count',
+                     'called', 'tags', 'difficulty')
+
         def __init__(self, **kwargs):
             self.id = kwargs.get('id')
             self.full_name = kwargs.get('fullname')
@@ -838,9 +1073,9 @@ class GroupMembers:
             self.former_full_name = kwargs.get('formerfullname')
             self.former_stage_name = kwargs.get('formerstagename')
             self.birth_date = kwargs.get('birthdate')
-            self.birth_country = kwargs.get('birthcountry')
-            self.birth_city = kwargs.get('birthcity')
-            self.gender = kwargs.get('gender')
+            self.birth_country = intern_string(kwargs.get('birthcountry'))
+            self.birth_city = intern_string(kwargs.get('birthcity'))
+            self.gender = intern_string(kwargs.get('gender'))
             self.description = kwargs.get('description')
             self.height = kwargs.get('height')
             self.twitter = kwargs.get('twitter')
@@ -855,19 +1090,22 @@ class GroupMembers:
             self.aliases = []
             self.local_aliases = {}  # server_id: [aliases]
             self.groups = []
-            self.zodiac = kwargs.get('zodiac')
+            self.zodiac = intern_string(kwargs.get('zodiac'))
             self.thumbnail = kwargs.get('thumbnail')
             self.banner = kwargs.get('banner')
-            self.blood_type = kwargs.get('bloodtype')
+            self.blood_type = intern_string(kwargs.get('bloodtype'))
             self.photo_count = 0
             # amount of times the idol has been called.
             self.called = 0
-            self.tags = kwargs.get('tags')
-            self.difficulty = kwargs.get('difficulty') or "medium"  # easy = 1, medium = 2, hard = 3
-            if self.tags:
-                self.tags = self.tags.split(',')
+            self.tags = split_tags(kwargs.get('tags'))
+            self.difficulty = intern_string(kwargs.get('difficulty') or "medium")  # easy = 1, medium = 2, hard = 3
 
     class Group:
+        # slots are used instead of an instance __dict__ since thousands of groups are kept in cache.
+        __slots__ = ('id', 'name', 'debut_date', 'disband_date', 'description', 'twitter', 'youtube', 'melon',
+                     'instagram', 'vlive', 'spotify', 'fancafe', 'facebook', 'tiktok', 'aliases', 'local_aliases',
+                     'members', 'fandom', 'company', 'website', 'thumbnail', 'banner', 'gender', 'photo_count', 'tags')
+
         def __init__(self, **kwargs):
             self.id = kwargs.get('groupid')
             self.name = kwargs.get('groupname')
@@ -887,13 +1125,10 @@ class GroupMembers:
             self.local_aliases = {}  # server_id: [aliases]
             self.members = []
             self.fandom = kwargs.get('fandom')
-            self.company = kwargs.get('company')
+            self.company = intern_string(kwargs.get('company'))
             self.website = kwargs.get('website')
             self.thumbnail = kwargs.get('thumbnail')
             self.banner = kwargs.get('banner')
-            self.gender = kwargs.get('gender')
+            self.gender = intern_string(kwargs.get('gender'))
             self.photo_count = 0
-            self.tags = kwargs.get('tags')
-            if self.tags:
-                self.tags = self.tags.split(',')
-
+            self.tags = split_tags(kwargs.get('tags'))
@@ -15,7 +15,7 @@ class Logging:
     @staticmethod
     async def get_channels_logged():
         """Get all the channels that are being logged."""
-        return ex.cache.list_of_logged_channels
+        return ex.cache.logged_channel_ids
 
     async def add_to_logging(self, server_id, channel_id):  # return true if status is on
         """Add a channel to be logged."""
@@ -28,7 +28,7 @@ class Logging:
             if server is None:
                 ex.cache.logged_channels[server_id] = {"send_all": 1, "logging_channel": channel_id, "channels": []}
             else:
-                ex.cache.list_of_logged_channels.append(channel_id)
+                ex.cache.logged_channel_ids.add(channel_id)
                 server['channels'].append(channel_id)
         else:
             await self.set_logging_status(server_id, 1)
@@ -43,7 +43,7 @@ class Logging:
     async def check_if_logged(server_id=None, channel_id=None):  # only one parameter should be passed in
         """Check if a server or channel is being logged."""
         if channel_id:
-            return channel_id in ex.cache.list_of_logged_channels
+            return channel_id in ex.cache.logged_channel_ids
         elif server_id:
             return server_id in ex.cache.logged_channels
 
@@ -56,17 +56,21 @@ class Logging:
         """Set a server's logging status."""
         await ex.conn.execute("UPDATE logging.servers SET status = $1 WHERE serverid = $2", status, server_id)
         if not status:
-            ex.cache.logged_channels.pop(server_id, None)
+            server = ex.cache.logged_channels.pop(server_id, None)
+            if server:
+                ex.cache.logged_channel_ids.difference_update(server['channels'])
         else:
-            logged_server = await ex.conn.fetchrow(
-                "SELECT id, serverid, channelid, sendall FROM logging.servers WHERE serverid = $1", server_id)
-            channels = await ex.conn.fetch("SELECT channelid FROM logging.channels WHERE server = $1", logged_server[0])
-            for channel in channels:
-                ex.cache.list_of_logged_channels.append(channel[0])
-            ex.cache.logged_channels[logged_server[1]] = {
-                "send_all": logged_server[3],
-                "logging_channel": logged_server[2],
-                "channels": [channel[0] for channel in channels]
+            logged_server = await ex.conn.fetch(
+                "SELECT s.channelid, s.sendall, c.channelid FROM logging.servers s LEFT JOIN logging.channels c "
+                "ON c.server = s.id WHERE s.serverid = $1", server_id)
+            if not logged_server:
+                return
+            channels = [channel_id for _, _, channel_id in logged_server if channel_id]
+            ex.cache.logged_channel_ids.update(channels)
+            ex.cache.logged_channels[server_id] = {
+                "send_all": logged_server[0][1],
+                "logging_channel": logged_server[0][0],
+                "channels": channels
             }
 
     @staticmethod
@@ -0,0 +1,112 @@
+from Utility import resources as ex
+from module import logger as log, keys
+import asyncio
+import time
+
+
+class MessageContext:
+    """Everything the message handlers need to know about a message, worked out once per message."""
+    __slots__ = ("message", "author_id", "is_bot", "is_banned", "guild_id", "channel_id", "content", "lower_content",
+                 "server_prefix", "used_server_prefix", "without_prefix", "lower_without_prefix", "first_word")
+
+    def __init__(self, message, server_prefix):
+        self.message = message
+        self.author_id = message.author.id
+        self.is_bot = message.author.bot
+        self.is_banned = self.author_id in ex.cache.bot_banned
+        self.guild_id = message.guild.id if message.guild else None
+        self.channel_id = message.channel.id
+        self.content = message.content or ""
+        self.lower_content = self.content.lower()
+        self.server_prefix = server_prefix
+        # whether the message starts with the prefix of the server. commands are only processed with it.
+        self.used_server_prefix = self.lower_content.startswith(server_prefix.lower())
+        """
+        The content after the server prefix, or after the default prefix since idol photos and custom commands
+        are also sent with the default prefix. None if the message does not start with either prefix.
+        """
+        if self.used_server_prefix:
+            self.without_prefix = self.content[len(server_prefix):]
+        elif self.content.startswith(keys.bot_prefix):
+            self.without_prefix = self.content[len(keys.bot_prefix):]
+        else:
+            self.without_prefix = None
+        self.lower_without_prefix = self.without_prefix.lower() if self.without_prefix is not None else None
+        self.first_word = self.lower_without_prefix.split(" ", 1)[0] if self.lower_without_prefix else None
+
+
+# noinspection PyBroadException,PyPep8
+class MessageRouter:
+    """Parses every message once into a MessageContext and only passes it to the handlers that want it.
+
+    Each handler has a predicate that only looks at the context, so most messages are finished after a few
+    dictionary lookups without starting a single handler.
+    """
+    def __init__(self):
+        self.handlers = []  # [ [name, handler, predicate, on_edit] ]
+        self.handler_stats = {}  # { name: [calls, seconds spent] } of the last minute.
+        self.unhandled_per_minute = 0
+
+    def add_handler(self, handler, predicate, on_edit=False, name=None):
+        """Add a message handler.
+
+        :param handler: coroutine function that receives the MessageContext.
+        :param predicate: function that receives the MessageContext and returns whether the handler should run.
+        :param on_edit: whether the handler also runs on messages that were edited shortly after being sent.
+        :param name: name of the handler in the metrics. Defaults to the name of the function.
+        """
+        self.handlers.append([name or handler.__name__, handler, predicate, on_edit])
+
+    async def create_context(self, message):
+        server_prefix = await ex.get_server_prefix(message.guild.id) if message.guild else keys.bot_prefix
+        return MessageContext(message, server_prefix)
+
+    async def process(self, message, edited=False):
+        """Pass a message to every handler whose predicate accepts it."""
+        ex.cache.messages_received_per_minute += 1
+        try:
+            message_context = await self.create_context(message)
+            handlers = []
+            for name, handler, predicate, on_edit in self.handlers:
+                if edited and not on_edit:
+                    continue
+                try:
+                    if predicate(message_context):
+                        handlers.append((name, handler))
+                except Exception as e:
+                    log.console(f"{e} - {name} predicate")
+            if not handlers:
+                self.unhandled_per_minute += 1
+            elif len(handlers) == 1:
+                await self.run_handler(*handlers[0], message_context)
+            else:
+                await asyncio.gather(*[self.run_handler(name, handler, message_context)
+                                       for name, handler in handlers])
+        except Exception as e:
+            log.console(f"{e} - MessageRouter.process")
+
+    async def run_handler(self, name, handler, message_context):
+        """Run a handler on its own so errors in one handler do not affect the others, and record its time."""
+        start_time = time.perf_counter()
+        try:
+            await handler(message_context)
+        except Exception as e:
+            log.console(f"{e} - {name}")
+        stats = self.handler_stats.get(name)
+        if not stats:
+            stats = self.handler_stats[name] = [0, 0]
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start_time
+
+    def get_metrics(self):
+        """Get the calls and average time of every handler in the last minute and reset them.
+
+        :returns: { metric_name: value }
+        """
+        metrics = {"messages_unhandled": self.unhandled_per_minute}
+        for name, (calls, seconds) in self.handler_stats.items():
+            metrics[f"message_handler_{name}_calls"] = calls
+            metrics[f"message_handler_{name}_avg_ms"] = seconds / calls * 1000 if calls else 0
+        self.handler_stats = {}
+        self.unhandled_per_minute = 0
+        return metrics
@@ -1,6 +1,6 @@
 from module import logger as log
 from Utility import resources as ex
-from module.keys import bot_prefix, bot_support_server_link, api_port, bot_id, bot_name, translate_private_key
+from module.keys import bot_prefix, bot_support_server_link, api_port, bot_id, bot_name
 import discord
 import random
 import json
@@ -9,25 +9,22 @@ import json
 # noinspection PyBroadException,PyPep8
 class Miscellaneous:
     @staticmethod
-    async def check_for_nword(message):
+    async def check_for_nword(message_context):
         """Processes new messages that contains the N word."""
-        message_sender = message.author
-        if not message_sender.bot:
-            message_content = message.clean_content
-            if ex.u_miscellaneous.check_message_not_empty(message):
-                # check if the message belongs to the bot
-                if message_content[0] != '%':
-                    if ex.u_miscellaneous.check_nword(message_content):
-                        ex.cache.n_words_per_minute += 1
-                        author_id = message_sender.id
-                        current_amount = ex.cache.n_word_counter.get(author_id)
-                        if current_amount:
-                            await ex.conn.execute("UPDATE general.nword SET nword = $1 WHERE userid = $2::bigint",
-                                                  current_amount + 1, author_id)
-                            ex.cache.n_word_counter[author_id] = current_amount + 1
-                        else:
-                            await ex.conn.execute("INSERT INTO general.nword VALUES ($1,$2)", author_id, 1)
-                            ex.cache.n_word_counter[author_id] = 1
+        message_content = message_context.message.clean_content
+        # check if the message belongs to the bot
+        if message_content and message_content[0] != '%':
+            if ex.u_miscellaneous.check_nword(message_content):
+                ex.cache.n_words_per_minute += 1
+                author_id = message_context.author_id
+                current_amount = ex.cache.n_word_counter.get(author_id)
+                if current_amount:
+                    await ex.conn.execute("UPDATE general.nword SET nword = $1 WHERE userid = $2::bigint",
+                                          current_amount + 1, author_id)
+                    ex.cache.n_word_counter[author_id] = current_amount + 1
+                else:
+                    await ex.conn.execute("INSERT INTO general.nword VALUES ($1,$2)", author_id, 1)
+                    ex.cache.n_word_counter[author_id] = 1
 
     @staticmethod
     async def check_if_temp_channel(channel_id):
@@ -39,10 +36,12 @@ class Miscellaneous:
         """Get all temporary channels in the DB."""
         return await ex.conn.fetch("SELECT chanid, delay FROM general.tempchannels")
 
-    async def delete_temp_messages(self, message):
+    @staticmethod
+    async def delete_temp_messages(message_context):
         """Delete messages that are temp channels"""
-        if await self.check_if_temp_channel(message.channel.id):
-            await message.delete(delay=ex.cache.temp_channels.get(message.channel.id))
+        delay = ex.cache.temp_channels.get(message_context.channel_id)
+        if delay is not None:
+            await message_context.message.delete(delay=delay)
 
     @staticmethod
     async def get_disabled_server_interactions(server_id):
@@ -101,13 +100,9 @@ class Miscellaneous:
         """Add 1 to the specific command count and to the count of the current minute."""
         ex.cache.commands_per_minute += 1
         session_id = await ex.u_cache.get_session_id()
-        command_count = ex.cache.command_counter.get(command_name)
-        if not command_count:
-            await ex.conn.execute("INSERT INTO stats.commands(sessionid, commandname, count) VALUES($1, $2, $3)", session_id, command_name, 1)
-            ex.cache.command_counter[command_name] = 1
-        else:
-            await ex.conn.execute("UPDATE stats.commands SET count = $1 WHERE commandname = $2 AND sessionid = $3", command_count + 1, command_name, session_id)
-            ex.cache.command_counter[command_name] += 1
+        ex.cache.command_counter[command_name] = (ex.cache.command_counter.get(command_name) or 0) + 1
+        # written to the database in the background.
+        ex.u_write_behind.add_command(session_id, command_name)
 
     @staticmethod
     async def add_session_count():
@@ -115,36 +110,29 @@ class Miscellaneous:
         session_id = await ex.u_cache.get_session_id()
         ex.cache.current_session += 1
         ex.cache.total_used += 1
-        await ex.conn.execute("UPDATE stats.sessions SET session = $1, totalused = $2 WHERE sessionid = $3", ex.cache.current_session, ex.cache.total_used, session_id)
-
-    async def process_commands(self, message):
-        message_sender = message.author
-        if not message_sender.bot:
-            message_content = message.clean_content
-            message_channel = message.channel
-            server_prefix = await ex.get_server_prefix_by_context(message)
-            # check if the user mentioned the bot and send them a help message.
-            if await self.check_for_bot_mentions(message):
-                await message.channel.send(
-                    f"Type `{server_prefix}help` for information on commands.")
-            if len(message_content) >= len(server_prefix):
-                changing_prefix = [bot_prefix + 'setprefix', bot_prefix + 'checkprefix']
-                if message.content[0:len(server_prefix)].lower() == server_prefix.lower() or message.content.lower() in changing_prefix:
-                    msg_without_prefix = message.content[len(server_prefix):len(message.content)]
-                    # only replace the prefix portion back to the default prefix if it is not %setprefix or %checkprefix
-                    if message.content.lower() not in changing_prefix:
-                        # change message.content so all on_message listeners have a bot prefix
-                        message.content = bot_prefix + msg_without_prefix
-                    # if a user is banned from the bot.
-                    if await self.check_if_bot_banned(message_sender.id):
-                        try:
-                            guild_id = await ex.get_server_id(message)
-                        except:
-                            guild_id = None
-                        if await self.check_message_is_command(message) or await ex.u_custom_commands.check_custom_command_name_exists(guild_id, msg_without_prefix):
-                            await self.send_ban_message(message_channel)
-                    else:
-                        await ex.client.process_commands(message)
+        # written to the database in the background.
+        ex.u_write_behind.add_session(session_id)
+
+    async def process_commands(self, message_context):
+        message = message_context.message
+        server_prefix = message_context.server_prefix
+        # check if the user mentioned the bot and send them a help message.
+        if await self.check_for_bot_mentions(message):
+            await message.channel.send(
+                f"Type `{server_prefix}help` for information on commands.")
+        changing_prefix = [bot_prefix + 'setprefix', bot_prefix + 'checkprefix']
+        if message_context.used_server_prefix or message_context.lower_content in changing_prefix:
+            msg_without_prefix = message_context.content[len(server_prefix):]
+            # only replace the prefix portion back to the default prefix if it is not %setprefix or %checkprefix
+            if message_context.lower_content not in changing_prefix:
+                # change message.content so the commands extension finds the bot prefix
+                message.content = bot_prefix + msg_without_prefix
+            # if a user is banned from the bot.
+            if message_context.is_banned:
+                if await self.check_message_is_command(message) or await ex.u_custom_commands.check_custom_command_name_exists(message_context.guild_id, msg_without_prefix):
+                    await self.send_ban_message(message.channel)
+            else:
+                await ex.client.process_commands(message)
 
     @staticmethod
     async def send_maintenance_message(channel):
@@ -228,6 +216,42 @@ class Miscellaneous:
         except:
             pass
 
+    @staticmethod
+    async def add_user_notification_to_cache(guild_id, user_id, phrase):
+        """Add a phrase that notifies a user when it is said in a server."""
+        ex.cache.user_notifications.setdefault(guild_id, {}).setdefault(phrase, set()).add(user_id)
+
+    @staticmethod
+    async def remove_user_notification_from_cache(guild_id, user_id, phrase):
+        """Remove a notification phrase of a user and any empty parts of the index."""
+        phrases = ex.cache.user_notifications.get(guild_id)
+        if not phrases:
+            return
+        user_ids = phrases.get(phrase)
+        if user_ids:
+            user_ids.discard(user_id)
+            if not user_ids:
+                phrases.pop(phrase, None)
+        if not phrases:
+            ex.cache.user_notifications.pop(guild_id, None)
+
+    @staticmethod
+    async def add_mod_mail_to_cache(user_id, channel_id):
+        """Link the DMs of a user and a mod channel in both directions. A mod channel has one user."""
+        await Miscellaneous.remove_mod_mail_from_cache(user_id)
+        previous_user_id = ex.cache.mod_mail_channels.get(channel_id)
+        if previous_user_id is not None:
+            await Miscellaneous.remove_mod_mail_from_cache(previous_user_id)
+        ex.cache.mod_mail[user_id] = channel_id
+        ex.cache.mod_mail_channels[channel_id] = user_id
+
+    @staticmethod
+    async def remove_mod_mail_from_cache(user_id):
+        """Remove the mod mail of a user from both directions."""
+        channel_id = ex.cache.mod_mail.pop(user_id, None)
+        if channel_id is not None and ex.cache.mod_mail_channels.get(channel_id) == user_id:
+            ex.cache.mod_mail_channels.pop(channel_id, None)
+
     @staticmethod
     async def check_if_bot_banned(user_id):
         """Check if the user can use the bot."""
@@ -288,21 +312,12 @@ class Miscellaneous:
 
     async def translate(self, text, src_lang, target_lang):
         try:
-            data = {
-                'text': text,
-                'src_lang': await self.get_language_code(src_lang),
-                'target_lang': await self.get_language_code(target_lang),
-                'p_key': translate_private_key
-            }
-            end_point = f"http://127.0.0.1:{api_port}/translate"
-            if ex.test_bot:
-                end_point = f"https://api.irenebot.com/translate"
-            async with ex.session.post(end_point, data=data) as r:
-                ex.cache.bot_api_translation_calls += 1
-                if r.status == 200:
-                    return json.loads(await r.text())
-                else:
-                    return None
+            response = await ex.u_api.translate(text, await self.get_language_code(src_lang),
+                                                await self.get_language_code(target_lang))
+            if response.status == 200:
+                return json.loads(response.body)
+        except ex.exceptions.APIUnavailable:
+            return None
         except Exception as e:
             log.console(e)
 
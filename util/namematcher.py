@@ -0,0 +1,95 @@
+class NameMatcher:
+    """Aho-Corasick automaton that finds every idol/group name inside a message in a single pass.
+
+    Names can be added and removed at any time. Only the failure links are recomputed after the
+    trie changes, which happens lazily on the next search.
+    """
+    def __init__(self):
+        self.children = [{}]  # node: {character: next_node}
+        self.depth = [0]  # length of the name that ends at a node
+        self.values = [[]]  # values of the name that ends at a node
+        self.fail = [0]  # longest proper suffix of a node that is also in the trie
+        self.outputs = [[]]  # nodes with values that end at a node, including through failure links
+        self.compiled = True
+
+    def add(self, name, value):
+        """Add a name and the value it returns when found."""
+        if not name:
+            return
+        node = 0
+        for char in name:
+            next_node = self.children[node].get(char)
+            if next_node is None:
+                next_node = len(self.children)
+                self.children[node][char] = next_node
+                self.children.append({})
+                self.depth.append(self.depth[node] + 1)
+                self.values.append([])
+                self.fail.append(0)
+                self.outputs.append([])
+                self.compiled = False
+            node = next_node
+        if not self.values[node]:
+            # the node becomes an output of itself and every node that fails to it.
+            self.compiled = False
+        self.values[node].append(value)
+
+    def remove(self, name, value):
+        """Remove a value of a name. The nodes are kept in the trie since other names may share them."""
+        node = 0
+        for char in name:
+            node = self.children[node].get(char)
+            if node is None:
+                return
+        if value in self.values[node]:
+            self.values[node].remove(value)
+            if not self.values[node]:
+                self.compiled = False
+
+    def compile(self):
+        """Compute the failure links and outputs of every node in breadth-first order."""
+        queue = []
+        for node in self.children[0].values():
+            self.fail[node] = 0
+            queue.append(node)
+        self.outputs[0] = []
+        for node in queue:
+            self.outputs[node] = ([node] if self.values[node] else []) + self.outputs[self.fail[node]]
+            for char, child in self.children[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.children[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.children[fail].get(char, 0)
+                queue.append(child)
+        self.compiled = True
+
+    def search(self, text):
+        """Find every name in a text.
+
+        :returns: [(start, end, value)] so that text[start:end] is the name that was found.
+        """
+        if not self.compiled:
+            self.compile()
+        matches = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.children[node]:
+                node = self.fail[node]
+            node = self.children[node].get(char, 0)
+            for output in self.outputs[node]:
+                start = index + 1 - self.depth[output]
+                for value in self.values[output]:
+                    matches.append((start, index + 1, value))
+        return matches
+
+    @staticmethod
+    def remove_spans(text, spans):
+        """Remove the (start, end) spans from a text, including overlapping spans."""
+        pieces = []
+        position = 0
+        for start, end in sorted(spans):
+            if start > position:
+                pieces.append(text[position:start])
+            position = max(position, end)
+        pieces.append(text[position:])
+        return "".join(pieces)
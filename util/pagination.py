@@ -0,0 +1,32 @@
+class LazyEmbedList:
+    """A list of embed pages that are only rendered when they are shown.
+
+    Commands with many pages build the contents of every page ahead of time (which can be cached),
+    but only the pages a user actually scrolls to are turned into embeds.
+    """
+    def __init__(self, pages, render_page):
+        """
+        :param pages: list with the contents of every page.
+        :param render_page: function that receives (page_index, page) and returns a discord.Embed.
+        """
+        self.pages = pages
+        self.render_page = render_page
+        self.rendered = {}  # { page_index: embed }
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, page_index):
+        if page_index < 0:
+            page_index += len(self.pages)
+        if not 0 <= page_index < len(self.pages):
+            raise IndexError(page_index)
+        embed = self.rendered.get(page_index)
+        if embed is None:
+            embed = self.rendered[page_index] = self.render_page(page_index, self.pages[page_index])
+        return embed
+
+    @staticmethod
+    def split_pages(items, page_size):
+        """Split a list into pages of page_size items."""
+        return [items[index:index + page_size] for index in range(0, len(items), page_size)]
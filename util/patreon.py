@@ -20,6 +20,32 @@ class Patreon:
             patreon_role = support_guild.get_role(int(patreon_super_role_id))
         return patreon_role.members
 
+    @staticmethod
+    async def update_patron_status(user_id, role_ids):
+        """Update the cache and db cache of a single user after their roles in the support server changed."""
+        if patreon_super_role_id in role_ids:
+            super_patron = True
+        elif patreon_role_id in role_ids:
+            super_patron = False
+        else:
+            super_patron = None
+
+        async with ex.conn.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM patreon.cache WHERE userid = $1", user_id)
+                if super_patron is not None:
+                    await conn.execute("INSERT INTO patreon.cache(userid, super) VALUES($1, $2)",
+                                       user_id, int(super_patron))
+            # permanent patrons keep their status regardless of their roles.
+            permanent_patron = await conn.fetchval("SELECT COUNT(*) FROM patreon.users WHERE userid = $1", user_id)
+
+        if permanent_patron:
+            ex.cache.patrons[user_id] = True
+        elif super_patron is None:
+            ex.cache.patrons.pop(user_id, None)
+        else:
+            ex.cache.patrons[user_id] = super_patron
+
     @staticmethod
     async def check_if_patreon(user_id, super_patron=False):
         """Check if the user is a patreon.
@@ -0,0 +1,104 @@
+from Utility import resources as ex
+from discord.ext import tasks
+from module import logger as log
+import asyncio
+import collections
+import time
+
+
+# noinspection PyBroadException,PyPep8
+class PhotoPool:
+    """Keeps photo links from the API ready to use so idol posts do not wait on the API.
+
+    The most called idols are refilled in the background, and guessing games fetch the photo of the next round
+    while the current round is played. Every link is only used once.
+    """
+    pool_size = 3  # links kept for every idol.
+    hot_idol_count = 100  # amount of the most called idols that are always kept filled.
+    max_age = 600  # seconds a link is kept before it is considered stale.
+    max_concurrent_fetches = 4  # background requests to the API at once, so requests from users come first.
+
+    def __init__(self):
+        self.pools = {}  # { (idol_id, guessing_game): deque([ (api_url, time_fetched) ]) }
+        self.fetching = {}  # { (idol_id, guessing_game): task } that is currently refilling a pool.
+        self.fetch_limit = asyncio.Semaphore(self.max_concurrent_fetches)
+
+    def get_photo(self, idol_id, guessing_game=False):
+        """Take a ready photo link of an idol from the pool.
+
+        :returns: The api url or None if there is no link ready.
+        """
+        pool = self.pools.get((idol_id, guessing_game))
+        while pool:
+            api_url, time_fetched = pool.popleft()
+            if time.time() - time_fetched < self.max_age:
+                ex.cache.photo_pool_hits_per_minute += 1
+                # refill the link that was just used.
+                self.prefetch(idol_id, guessing_game)
+                return api_url
+        ex.cache.photo_pool_misses_per_minute += 1
+        return None
+
+    def prefetch(self, idol_id, guessing_game=False):
+        """Fill the pool of an idol in the background if it is not full."""
+        key = (idol_id, guessing_game)
+        pool = self.pools.get(key)
+        if key in self.fetching or (pool and len(pool) >= self.pool_size):
+            return
+        self.fetching[key] = asyncio.create_task(self.fill_pool(idol_id, guessing_game))
+
+    async def fill_pool(self, idol_id, guessing_game):
+        """Fetch links from the API until the pool of an idol is full."""
+        key = (idol_id, guessing_game)
+        try:
+            pool = self.pools.setdefault(key, collections.deque(maxlen=self.pool_size))
+            while len(pool) < self.pool_size:
+                async with self.fetch_limit:
+                    api_url = await self.fetch_photo(idol_id, guessing_game)
+                if not api_url:
+                    break
+                pool.append((api_url, time.time()))
+        except Exception as e:
+            log.console(f"{e} - PhotoPool.fill_pool")
+        finally:
+            self.fetching.pop(key, None)
+
+    @staticmethod
+    async def fetch_photo(idol_id, guessing_game=False):
+        """Request a photo link of an idol from the API.
+
+        Videos are not pooled since they are sent as files, so only image links are returned.
+        Nothing is requested while the API is struggling so requests from users come first.
+        """
+        if not ex.u_api.is_available("photos"):
+            return
+        try:
+            response = await ex.u_api.get_idol_photo(idol_id, guessing_game, retries=0)
+        except ex.exceptions.APIUnavailable:
+            return
+        if response.status == 200 or response.status == 301:
+            return response.url
+
+    def get_hot_idols(self):
+        """Get the ids of the most called idols that have photos."""
+        idols = [idol for idol in ex.cache.idols if idol.photo_count and idol.called]
+        idols.sort(key=lambda idol: idol.called, reverse=True)
+        return [idol.id for idol in idols[:self.hot_idol_count]]
+
+    @tasks.loop(seconds=30, minutes=0, hours=0, reconnect=True)
+    async def refill_hot_idols(self):
+        """Looped every 30 seconds to keep the pools of the most called idols filled and remove stale pools."""
+        try:
+            hot_idols = self.get_hot_idols()
+            hot_keys = {(idol_id, False) for idol_id in hot_idols}
+            for key in list(self.pools):
+                pool = self.pools[key]
+                while pool and time.time() - pool[0][1] >= self.max_age:
+                    pool.popleft()
+                # pools of idols that are no longer requested are removed once they are used up.
+                if not pool and key not in hot_keys and key not in self.fetching:
+                    self.pools.pop(key, None)
+            for idol_id in hot_idols:
+                self.prefetch(idol_id)
+        except Exception as e:
+            log.console(f"{e} - PhotoPool.refill_hot_idols")
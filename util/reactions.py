@@ -0,0 +1,63 @@
+from Utility import resources as ex
+import asyncio
+
+
+# noinspection PyBroadException,PyPep8
+class ReactionRouter:
+    """Sends raw reaction events to whatever is waiting for a reaction on that message.
+
+    Waiters are stored by message id so every reaction is a single lookup instead of running the check
+    of every wait_for('reaction_add') in the bot. Every waiter expires after its timeout.
+    """
+    def __init__(self):
+        self.waiters = {}  # { message_id: [check, future] }
+        self.expired_per_minute = 0
+
+    def dispatch(self, payload):
+        """Pass a raw reaction event to the waiter of its message. Reactions of the bot are ignored."""
+        waiter = self.waiters.get(payload.message_id)
+        if not waiter or payload.user_id == ex.client.user.id:
+            return
+        check, future = waiter
+        if future.done():
+            return
+        try:
+            if check(payload):
+                future.set_result(payload)
+        except Exception as e:
+            future.set_exception(e)
+
+    async def wait_for_reaction(self, message_id, check, timeout=60):
+        """Wait for a reaction on a message that passes the check.
+
+        A new waiter on the same message replaces the previous one.
+
+        :param message_id: id of the message to wait on.
+        :param check: function that receives the RawReactionActionEvent and returns whether it is accepted.
+        :param timeout: seconds to wait before the waiter expires.
+        :returns: RawReactionActionEvent
+        :raises asyncio.TimeoutError: if no reaction passed the check in time.
+        """
+        future = asyncio.get_event_loop().create_future()
+        self.waiters[message_id] = [check, future]
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.expired_per_minute += 1
+            raise
+        finally:
+            waiter = self.waiters.get(message_id)
+            if waiter and waiter[1] is future:
+                self.waiters.pop(message_id, None)
+
+    def get_metrics(self):
+        """Get the live waiters and the waiters that expired in the last minute.
+
+        :returns: { metric_name: value }
+        """
+        metrics = {
+            "reaction_waiters": len(self.waiters),
+            "reaction_waiters_expired": self.expired_per_minute
+        }
+        self.expired_per_minute = 0
+        return metrics
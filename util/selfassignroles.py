@@ -100,20 +100,15 @@ class SelfAssignRoles:
         if results:
             return results.get('roles')
 
-    async def check_for_self_assignable_role(self, message):
+    async def check_for_self_assignable_role(self, message_context):
         """Main process for processing self-assignable roles."""
         try:
-            author = message.author
-            server_id = await ex.get_server_id(message)
-            if await self.check_self_assignable_channel(server_id, message.channel):
-                if message.content:
-                    prefix = message.content[0]
-                    if len(message.content) > 1:
-                        msg = message.content[1:len(message.content)]
-                    else:
-                        return
-                    role, role_name = await self.get_self_role(msg, server_id)
-                    await self.process_member_roles(message, role, role_name, prefix, author)
+            message = message_context.message
+            if len(message.content) > 1:
+                prefix = message.content[0]
+                msg = message.content[1:]
+                role, role_name = await self.get_self_role(msg, message_context.guild_id)
+                await self.process_member_roles(message, role, role_name, prefix, message.author)
         except Exception as e:
             log.console(e)
 
@@ -0,0 +1,96 @@
+from Utility import resources as ex
+from discord.ext import tasks
+from module import logger as log
+from module.keys import cache_snapshot_location
+import asyncio
+import os
+import pickle
+import struct
+import time
+
+
+# noinspection PyBroadException,PyPep8
+class Snapshot:
+    """Saves the database cache to disk so a restarted Irene can serve traffic before the cache is rebuilt.
+
+    File Format:
+    header -> magic (4 bytes) | format version (unsigned short) | time created (double)
+    body -> a pickle stream of { cache_attribute: value }
+    """
+    magic = b"IRNC"
+    # increase the version whenever the structure of a cached object changes so older snapshots are ignored.
+    version = 6
+    header = struct.Struct(">4sHd")
+    # attributes of ex.cache that are loaded from the database.
+    cache_attributes = [
+        'idol_photos', 'group_photos', 'user_notifications', 'mod_mail', 'mod_mail_channels', 'bot_banned', 'logged_channels',
+        'logged_channel_ids', 'server_prefixes', 'welcome_messages', 'temp_channels', 'archived_channels', 'n_word_counter',
+        'idols', 'groups', 'restricted_channels', 'send_here_channels', 'dead_image_cache', 'bot_statuses', 'custom_commands',
+        'weverse_channels', 'assignable_roles', 'reminders', 'timezones', 'guessing_game_counter', 'patrons'
+    ]
+
+    def get_snapshot(self):
+        """Serialize the current cache."""
+        cache = {attribute: getattr(ex.cache, attribute) for attribute in self.cache_attributes}
+        return self.header.pack(self.magic, self.version, time.time()) + pickle.dumps(cache, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def write_snapshot(snapshot):
+        """Write a snapshot to disk. The old snapshot is only replaced once the new one is completely written."""
+        temp_location = f"{cache_snapshot_location}.tmp"
+        with open(temp_location, "wb") as file:
+            file.write(snapshot)
+        os.replace(temp_location, cache_snapshot_location)
+
+    def load_snapshot(self):
+        """Load the cache from the snapshot on disk.
+
+        :returns: True if the snapshot was loaded.
+        """
+        past_time = time.time()
+        try:
+            with open(cache_snapshot_location, "rb") as file:
+                magic, version, created_at = self.header.unpack(file.read(self.header.size))
+                if magic != self.magic or version != self.version:
+                    log.console("Cache Snapshot was ignored due to being a different version.")
+                    return False
+                # the pickle is streamed from the file rather than read into memory first.
+                cache = pickle.load(file)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            log.console(f"{e} - Snapshot.load_snapshot")
+            return False
+        for attribute, value in cache.items():
+            if attribute in self.cache_attributes:
+                setattr(ex.cache, attribute, value)
+        # indexes are not saved since they are rebuilt from the idols and groups.
+        ex.u_group_members.set_idol_cache(ex.cache.idols)
+        ex.u_group_members.set_group_cache(ex.cache.groups)
+        log.console(f"Cache Snapshot from {time.ctime(created_at)} loaded in {round(time.time() - past_time, 3)}s.")
+        return True
+
+    async def save_snapshot(self):
+        """Save the current cache to disk without blocking the event loop while writing."""
+        if not ex.u_cache.cache_created:
+            # do not replace a good snapshot with a cache that has not loaded from the database yet.
+            return
+        snapshot = self.get_snapshot()
+        await asyncio.get_running_loop().run_in_executor(ex.thread_pool, self.write_snapshot, snapshot)
+
+    @tasks.loop(seconds=0, minutes=30, hours=0, reconnect=True)
+    async def save_snapshot_loop(self):
+        """Looped every 30 minutes to save the cache to disk."""
+        try:
+            await self.save_snapshot()
+        except Exception as e:
+            log.console(f"{e} - Snapshot.save_snapshot_loop")
+
+    @save_snapshot_loop.after_loop
+    async def save_snapshot_on_shutdown(self):
+        """Save the cache one last time when Irene shuts down."""
+        try:
+            if ex.u_cache.cache_created:
+                self.write_snapshot(self.get_snapshot())
+        except Exception as e:
+            log.console(f"{e} - Snapshot.save_snapshot_on_shutdown")
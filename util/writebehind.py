@@ -0,0 +1,134 @@
+from Utility import resources as ex
+from discord.ext import tasks
+from module import logger as log
+import asyncpg
+import collections
+
+
+# noinspection PyBroadException,PyPep8
+class WriteBehind:
+    """Collects idol call counts and command statistics in memory and writes them to the database in batches.
+
+    Only the amount added since the last flush is written, and it is added to the value in the database,
+    so a stale count in the cache can never lower the count in the database. The tables have no unique
+    constraint to upsert on, so existing rows are updated and the missing rows are inserted afterwards.
+    """
+    max_failed_flushes = 3  # failed batches in a row before rows are written one at a time.
+    # errors caused by the values of a row. only these rows are dropped, any other error keeps the counts.
+    row_errors = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+    idol_update = "UPDATE groupmembers.count c SET count = c.count + d.calls FROM unnest($1::bigint[], " \
+                  "$2::bigint[]) AS d(memberid, calls) WHERE c.memberid = d.memberid"
+    idol_insert = "INSERT INTO groupmembers.count(memberid, count) SELECT d.memberid, d.calls FROM " \
+                  "unnest($1::bigint[], $2::bigint[]) AS d(memberid, calls) WHERE NOT EXISTS " \
+                  "(SELECT 1 FROM groupmembers.count c WHERE c.memberid = d.memberid)"
+    command_update = "UPDATE stats.commands c SET count = c.count + d.calls FROM unnest($1::bigint[], $2::text[], " \
+                     "$3::bigint[]) AS d(sessionid, commandname, calls) WHERE c.sessionid = d.sessionid AND " \
+                     "c.commandname = d.commandname"
+    command_insert = "INSERT INTO stats.commands(sessionid, commandname, count) SELECT d.sessionid, d.commandname, " \
+                     "d.calls FROM unnest($1::bigint[], $2::text[], $3::bigint[]) AS d(sessionid, commandname, calls) " \
+                     "WHERE NOT EXISTS (SELECT 1 FROM stats.commands c WHERE c.sessionid = d.sessionid AND " \
+                     "c.commandname = d.commandname)"
+    session_update = "UPDATE stats.sessions s SET session = s.session + d.calls, totalused = s.totalused + d.calls " \
+                     "FROM unnest($1::bigint[], $2::bigint[]) AS d(sessionid, calls) WHERE s.sessionid = d.sessionid"
+
+    def __init__(self):
+        self.idol_calls = collections.Counter()  # { idol_id: calls since the last flush }
+        self.command_calls = collections.Counter()  # { (session_id, command_name): uses since the last flush }
+        self.session_calls = collections.Counter()  # { session_id: commands used since the last flush }
+        self.failed_flushes = 0
+
+    def add_idol_call(self, idol):
+        """Add 1 to the amount of times an idol has been called."""
+        idol.called = (idol.called or 0) + 1
+        self.idol_calls[idol.id] += 1
+
+    def add_command(self, session_id, command_name):
+        """Add 1 to the uses of a command in a session."""
+        self.command_calls[(session_id, command_name)] += 1
+
+    def add_session(self, session_id):
+        """Add 1 to the amount of commands used in a session and in total."""
+        self.session_calls[session_id] += 1
+
+    async def write_calls(self, idol_calls, command_calls, session_calls):
+        """Add the calls to the database in a single transaction."""
+        idol_ids, idol_counts = list(idol_calls.keys()), list(idol_calls.values())
+        session_ids, command_names = [key[0] for key in command_calls], [key[1] for key in command_calls]
+        command_counts = list(command_calls.values())
+        async with ex.conn.acquire() as conn:
+            async with conn.transaction():
+                if idol_calls:
+                    await conn.execute(self.idol_update, idol_ids, idol_counts)
+                    await conn.execute(self.idol_insert, idol_ids, idol_counts)
+                if command_calls:
+                    await conn.execute(self.command_update, session_ids, command_names, command_counts)
+                    await conn.execute(self.command_insert, session_ids, command_names, command_counts)
+                if session_calls:
+                    await conn.execute(self.session_update, list(session_calls.keys()), list(session_calls.values()))
+
+    async def flush(self):
+        """Write every pending change to the database in a single transaction.
+
+        If the batch keeps failing, rows are written one at a time and the rows with values the database rejects
+        are dropped, so a single bad row can not stop every count from being saved.
+        """
+        if not ex.conn or not (self.idol_calls or self.command_calls or self.session_calls):
+            return
+        # swap out the pending changes so counts added while writing are kept for the next flush.
+        idol_calls, self.idol_calls = self.idol_calls, collections.Counter()
+        command_calls, self.command_calls = self.command_calls, collections.Counter()
+        session_calls, self.session_calls = self.session_calls, collections.Counter()
+        if self.failed_flushes >= self.max_failed_flushes:
+            if await self.write_rows_separately(idol_calls, command_calls, session_calls):
+                self.failed_flushes = 0
+            return
+        try:
+            await self.write_calls(idol_calls, command_calls, session_calls)
+            self.failed_flushes = 0
+        except Exception as e:
+            log.console(f"{e} - WriteBehind.flush")
+            self.failed_flushes += 1
+            # keep the calls for the next flush, together with the calls added while writing.
+            self.idol_calls.update(idol_calls)
+            self.command_calls.update(command_calls)
+            self.session_calls.update(session_calls)
+
+    async def write_rows_separately(self, idol_calls, command_calls, session_calls):
+        """Write every row on its own and drop the rows with values the database rejects.
+        On any other error, the rows that were not written yet are kept for the next flush.
+
+        :returns: True if every row was written or dropped.
+        """
+        empty = collections.Counter()
+        rows = [[collections.Counter({idol_id: calls}), empty, empty] for idol_id, calls in idol_calls.items()]
+        rows += [[empty, collections.Counter({key: calls}), empty] for key, calls in command_calls.items()]
+        rows += [[empty, empty, collections.Counter({session_id: calls})]
+                 for session_id, calls in session_calls.items()]
+        for position, row in enumerate(rows):
+            try:
+                await self.write_calls(*row)
+            except self.row_errors as e:
+                log.console(f"{e} - WriteBehind dropped {row}")
+            except Exception as e:
+                log.console(f"{e} - WriteBehind.write_rows_separately")
+                for row_idol_calls, row_command_calls, row_session_calls in rows[position:]:
+                    self.idol_calls.update(row_idol_calls)
+                    self.command_calls.update(row_command_calls)
+                    self.session_calls.update(row_session_calls)
+                return False
+        return True
+
+    async def stop(self):
+        """Stop the flush loop and write the remaining counts. Called before Irene shuts down."""
+        self.flush_loop.stop()
+        await self.flush()
+
+    @tasks.loop(seconds=5, minutes=0, hours=0, reconnect=True)
+    async def flush_loop(self):
+        """Looped every 5 seconds to write the collected counts to the database."""
+        await self.flush()
+
+    @flush_loop.after_loop
+    async def flush_on_shutdown(self):
+        """Write the remaining counts when Irene shuts down."""
+        await self.flush()